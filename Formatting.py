@@ -0,0 +1,134 @@
+"""
+FIR Text Formatting & Normalization
+-----------------------------------
+Local (no external API) helpers to:
+1. Build the structured `Formatted` value from a free-text FIR description
+   (`parse_fir_description`, used by `register_fir_app.py`).
+2. Normalize text once per record into the `Search_Text` column that the
+   search paths (KMP, incremental refresh, BM25) match against directly:
+   case folding, punctuation stripping, stopword removal, tokenization.
+
+Normalization is memoized per distinct string, and `normalize_series`
+works on unique values only, so backfilling millions of templated rows
+costs roughly one normalization per distinct `Formatted` value.
+
+Backfill an existing dataset in place (chunked, bounded memory):
+    python3 Formatting.py synthetic_fir1.csv
+"""
+
+import os
+import re
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMN = "Search_Text"
+SOURCE_COLUMN = "Formatted"
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "by", "to", "for",
+    "from", "with", "into", "was", "were", "is", "are", "be", "been", "has",
+    "had", "have", "his", "her", "their", "this", "that", "its", "as",
+})
+
+_PUNCT_RE = re.compile(r"[\W_]+", re.UNICODE)
+_DESC_RE = re.compile(
+    r"^(?P<crime>.+?)\s+by\s+(?P<rest>.+?)"
+    r"(?:\s+on\s+\d{4}-\d{2}-\d{2})?"
+    r"(?:,\s*(?P<victims>\d+\s+victims?))?\s*$",
+    re.IGNORECASE,
+)
+# The place follows the last " in ": modus operandi such as "Hidden in vehicles" contain one themselves
+_LOCATION_RE = re.compile(r"^(?P<how>.+)\s+in\s+(?P<location>.+)$", re.IGNORECASE)
+
+
+def parse_fir_description(text):
+    """Structure a description like "Robbery by Snatching in Camp on 2024-01-01, 2 victims"
+    into the dataset's `Formatted` shape "<act> <how> <place>", e.g. "Robbery Snatching Camp".
+    The date and victim count are dropped, as in existing rows.
+    Text that does not follow the "<act> by <how> [in <place>]" shape is returned cleaned up.
+    """
+    text = " ".join((text or "").split())
+    m = _DESC_RE.match(text)
+    if not m:
+        return text
+    loc = _LOCATION_RE.match(m.group("rest"))
+    if loc:
+        return f"{m.group('crime')} {loc.group('how')} {loc.group('location')}"
+    return f"{m.group('crime')} {m.group('rest')}"
+
+
+def split_tokens(text):
+    """Normalized tokens of `text` as a tuple: casefolded, punctuation stripped, stopwords removed."""
+    return tuple(t for t in _PUNCT_RE.sub(" ", text.casefold()).split() if t not in STOPWORDS)
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text):
+    """Memoized `split_tokens`, for short texts that repeat (queries, categorical values). Texts seen only
+    once, such as whole documents being indexed, should use `split_tokens` so they don't evict those entries.
+    """
+    return split_tokens(text)
+
+
+def normalize_text(text):
+    """Normalized search string for one record or query (tokens joined by single spaces)."""
+    if text is None or (isinstance(text, float) and text != text):
+        return ""
+    return " ".join(tokenize(str(text)))
+
+
+def normalize_series(series):
+    """Vectorized normalize_text: normalizes each distinct value once and broadcasts back."""
+    codes, uniques = pd.factorize(series.astype("string"), use_na_sentinel=True)
+    normalized = np.array([normalize_text(v) for v in uniques] + [""], dtype=object)
+    # NA values get code -1, which picks the trailing "" entry
+    return pd.Series(normalized[codes], index=series.index, dtype=object)
+
+
+def add_search_column(frame, source=SOURCE_COLUMN, target=SEARCH_COLUMN):
+    """Fill `target` for rows where it is missing/empty (all rows if the column is absent)."""
+    if source not in frame:
+        frame[target] = ""
+        return frame
+    if target not in frame:
+        frame[target] = normalize_series(frame[source])
+        return frame
+    missing = frame[target].isna() | (frame[target].astype(str) == "")
+    if missing.any():
+        frame.loc[missing, target] = normalize_series(frame.loc[missing, source])
+    return frame
+
+
+def search_text(frame, source=SOURCE_COLUMN, target=SEARCH_COLUMN):
+    """The normalized search column of `frame`, computing it on the fly for legacy data without one."""
+    if target in frame:
+        col = frame[target].fillna("").astype(str)
+        missing = col == ""
+        if missing.any() and source in frame:
+            col = col.copy()
+            col[missing] = normalize_series(frame.loc[missing, source])
+        return col
+    if source in frame:
+        return normalize_series(frame[source])
+    return pd.Series("", index=frame.index, dtype=object)
+
+
+def backfill_csv(path, chunksize=100_000):
+    """Add/complete the Search_Text column of a CSV in place, one chunk at a time."""
+    tmp_path = path + ".tmp"
+    header = True
+    with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+            add_search_column(chunk)
+            chunk.to_csv(out, index=False, header=header)
+            header = False
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "synthetic_fir1.csv"
+    backfill_csv(csv_path)
+    print(f"✅ Backfilled {SEARCH_COLUMN} in {csv_path}")
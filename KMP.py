@@ -1,4 +1,6 @@
 import csv
+import re
+from Formatting import normalize_text, STOPWORDS, SEARCH_COLUMN
 
 def computeLPS(pat, M, lps):
     # handle empty pattern
@@ -47,9 +49,29 @@ def KMP(pat, s):
 
     return False  # Pattern not found
 
+def extract_keywords(desc):
+    """Extract unique lowercase alphanumeric tokens (length >= 3, stopwords removed) from a free-text description."""
+    tokens = re.findall(r"\b[a-zA-Z0-9]{3,}\b", (desc or "").lower())
+    tokens = [t for t in tokens if t not in STOPWORDS]
+    return list(dict.fromkeys(tokens))  # preserve order, unique
+
+def matches_any(patterns, text):
+    # True if any (already normalized) pattern occurs in text
+    for pat in patterns:
+        try:
+            if KMP(pat, text):
+                return True
+        except Exception:
+            # if KMP fails for any reason, skip this pattern
+            continue
+    return False
+
 def filter_csv_by_pattern(input_csv, output_csv, pattern):
-    # normalize pattern to lowercase and strip whitespace
-    pattern = (pattern or "").strip().lower()
+    # normalize pattern the same way as the Search_Text column
+    pattern = normalize_text(pattern)
+    if not pattern:
+        # an empty pattern (e.g. only stopwords) would match every row
+        raise ValueError("Search pattern is empty after normalization (only stopwords/punctuation).")
     with open(input_csv, mode='r', encoding='utf-8') as infile, open(output_csv, mode='w', newline='', encoding='utf-8') as outfile:
         reader = csv.DictReader(infile)
         fieldnames = reader.fieldnames
@@ -57,14 +79,14 @@ def filter_csv_by_pattern(input_csv, output_csv, pattern):
 
         writer.writeheader()
         for row in reader:
-            formatted = (row.get('Formatted') or "").lower()
-            if KMP(pattern, formatted):
+            # match the precomputed normalized column; normalize legacy rows on the fly
+            text = row.get(SEARCH_COLUMN) or normalize_text(row.get('Formatted'))
+            if KMP(pattern, text):
                 writer.writerow(row)
 
 if __name__ == "__main__":
     input_csv = "/mnt/StorageHDD/Projects/DAA_PBL/synthetic_fir1.csv"
     output_csv = "filtered_fir.csv"
     pattern = input("Enter the pattern to search: ")
-    pattern = (pattern or "").strip().lower()
     filter_csv_by_pattern(input_csv, output_csv, pattern)
     print(f"Filtered rows saved to {output_csv}")
@@ -12,36 +12,292 @@ Run with:
     streamlit run fir_dashboard_app.py
 """
 
+from startup import StartupTimer, LazyModule, IMPORT_TIMES
+
+startup_timer = StartupTimer()
+
 import streamlit as st
 import pandas as pd
 import os
-import io
-from KMP import filter_csv_by_pattern, KMP  # your KMP file (KMP function used for in-memory matching)
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
+from KMP import extract_keywords  # your KMP file (KMP function used for in-memory matching)
+from Formatting import add_search_column
+from incremental import save_search_state, load_search_state, search_patterns, read_header, read_tail_frame, filter_frame, filter_mask, append_rows
+from bm25 import build_index, document_texts, tokenize
+from export import EXPORT_FORMATS, LARGE_EXPORT_ROWS, export_bytes, export_formats
+from bitmap_index import BitmapIndex, RoaringBitmap, YEAR_MONTH
+from term_index import sync_term_store, top_terms, default_db_path
+from watchlist import load_queries, add_query, remove_query, make_query, read_recent_alerts, default_watchlist_path, default_alert_log_path
+from generate_data import POLICE_STRUCTURE, CRIMINAL_ACTS
+from reports import all_scopes, scope_title, load_manifest, load_snapshot, default_report_dir
+import chart_data
+from chart_data import add_derived_columns
+import threading
+
+# Visualization libraries are imported on first use (see startup.py), not before the first paint
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+plt = LazyModule("matplotlib.pyplot")
+sns = LazyModule("seaborn")
+wordcloud = LazyModule("wordcloud")
 
 # --- Paths ---
 INPUT_CSV = "/mnt/StorageHDD/Projects/DAA_PBL/synthetic_fir1.csv"
 FILTERED_CSV = "filtered_fir.csv"
+TERM_DB = default_db_path(INPUT_CSV)
+WATCHLIST_PATH = default_watchlist_path(INPUT_CSV)
+ALERT_LOG = default_alert_log_path(INPUT_CSV)
+REPORT_DIR = default_report_dir(INPUT_CSV)
+AUTO_REFRESH_SECONDS = 10
+KEYWORD_CACHE_SIZE = 32  # refine-keyword bitmaps kept per filtered frame
 
 st.set_page_config(page_title="FIR Pattern Dashboard", layout="wide")
 
+# --- Data Helpers ---
+@st.cache_data(show_spinner=False)
+def cached_top_terms(db_path, offset, limit, divisions, stations, acts, year_months):
+    """Top terms roll-up; `offset` is part of the cache key so new FIRs invalidate it."""
+    return top_terms(db_path, limit, divisions, stations, acts, year_months)
+
+@st.cache_resource
+def shared_dataset(input_csv=INPUT_CSV):
+    """Process-wide copy of INPUT_CSV, loaded once and shared read-only by every session.
+    Kept in sync by appending the CSV tail; the BM25 index is attached lazily on first ranked search.
+    """
+    return {"lock": threading.Lock(), "frame": None, "offset": 0, "header": None, "bm25": None}
+
+def sync_shared_dataset(input_csv=INPUT_CSV, with_bm25=False):
+    """Bring the shared dataset up to date (tail only, or a full load if the file was rewritten).
+    Returns the entry; its frame is replaced rather than modified, so earlier references stay valid.
+    """
+    entry = shared_dataset(input_csv)
+    with entry["lock"]:
+        tail = None
+        if entry["frame"] is not None:
+            tail, new_offset = read_tail_frame(input_csv, entry["offset"], entry["header"])
+        if tail is None:
+            offset = os.path.getsize(input_csv)
+            header = read_header(input_csv)
+            frame = add_search_column(pd.read_csv(input_csv))
+            entry.update(frame=frame, offset=offset, header=header, bm25=None)
+        elif not tail.empty:
+            tail = add_search_column(tail)
+            if entry["bm25"] is not None:
+                entry["bm25"].add_documents(document_texts(tail))
+            entry.update(frame=pd.concat([entry["frame"], tail], ignore_index=True), offset=new_offset)
+        if with_bm25 and entry["bm25"] is None:
+            entry["bm25"] = build_index(entry["frame"])
+        return entry
+
+@st.cache_resource
+def shared_filtered(output_csv=FILTERED_CSV):
+    """Process-wide FILTERED_CSV frame, its bitmap index and refine-keyword bitmaps, shared read-only by every session.
+    `search_lock` serializes searches and tail refreshes (saved state -> FILTERED_CSV -> saved state) across sessions.
+    """
+    return {"lock": threading.Lock(), "search_lock": threading.RLock(), "mtime": None, "frame": None, "index": None,
+            "keyword_hits": {}}
+
+def get_filtered_frame():
+    """The shared filtered frame; reloaded only if FILTERED_CSV changed underneath us."""
+    entry = shared_filtered()
+    mtime = os.stat(FILTERED_CSV).st_mtime_ns
+    with entry["lock"]:
+        if entry["mtime"] != mtime:
+            entry.update(mtime=mtime, frame=add_derived_columns(pd.read_csv(FILTERED_CSV)), index=None, keyword_hits={})
+        st.session_state["fir_df_mtime"] = entry["mtime"]
+        return entry["frame"]
+
+def get_bitmap_index(frame):
+    """Bitmap index over the shared filtered frame; built once per load and extended when tail rows are merged."""
+    entry = shared_filtered()
+    with entry["lock"]:
+        if entry["frame"] is frame and entry["index"] is not None:
+            return entry["index"]
+        index = BitmapIndex.from_frame(frame)
+        if entry["frame"] is frame:
+            entry["index"] = index
+        return index
+
+def get_keyword_hits(frame, refine):
+    """Rows of the shared filtered frame matching the refine keyword, as a bitmap; cached per
+    (FILTERED_CSV mtime, row count, keyword) so reruns with the same refine box don't rescan the text.
+    Raises ValueError for an unusable keyword.
+    """
+    entry = shared_filtered()
+    key = (entry["mtime"], len(frame), refine)
+    with entry["lock"]:
+        hits = entry["keyword_hits"].get(key) if entry["frame"] is frame else None
+    if hits is not None:
+        return hits
+    hits = RoaringBitmap.from_mask(filter_mask(frame, search_patterns("pattern", refine)))
+    with entry["lock"]:
+        if entry["frame"] is frame:
+            if len(entry["keyword_hits"]) >= KEYWORD_CACHE_SIZE:
+                entry["keyword_hits"].pop(next(iter(entry["keyword_hits"])))  # oldest first
+            entry["keyword_hits"][key] = hits
+    return hits
+
+def filter_by_description(desc, output_csv=FILTERED_CSV):
+    """Tokenize a long FIR description into keywords, then match against the shared dataset using KMP.
+    Writes `output_csv` with rows that match any extracted keyword.
+    """
+    tokens = extract_keywords(desc)
+    if not tokens:
+        raise ValueError("No valid keywords found in description (need tokens length>=3).")
+
+    # Match against the precomputed normalized Search_Text column of the shared dataset
+    entry = sync_shared_dataset()
+    with entry["lock"]:
+        # the offset saved with the search must be the one this frame covers; another session may sync meanwhile
+        frame, offset, header = entry["frame"], entry["offset"], entry["header"]
+    out_df = filter_frame(frame, tokens)
+    out_df.to_csv(output_csv, index=False, encoding='utf-8')
+    return out_df, offset, header
+
+def filter_by_pattern(pattern, output_csv=FILTERED_CSV):
+    """KMP pattern search over the shared dataset (same matching as KMP.filter_csv_by_pattern)."""
+    patterns = search_patterns("pattern", pattern)
+    entry = sync_shared_dataset()
+    with entry["lock"]:
+        frame, offset, header = entry["frame"], entry["offset"], entry["header"]
+    out_df = filter_frame(frame, patterns)
+    out_df.to_csv(output_csv, index=False, encoding='utf-8')
+    return out_df, offset, header
+
+def rank_by_description(desc, top_k=200, output_csv=FILTERED_CSV):
+    """Rank FIRs by BM25 similarity to `desc` and write only the `top_k` best rows (with a BM25_Score column)."""
+    terms = tokenize(desc)
+    if not terms:
+        raise ValueError("No valid keywords found in description (need tokens length>=3).")
+    entry = sync_shared_dataset(with_bm25=True)
+    with entry["lock"]:
+        # frame and index must be read together; a concurrent sync may be appending to both
+        frame, offset, header = entry["frame"], entry["offset"], entry["header"]
+        hits = entry["bm25"].top_k(terms, int(top_k))
+    out_df = frame.iloc[[doc_id for _, doc_id in hits]].copy()
+    out_df['BM25_Score'] = [round(score, 4) for score, _ in hits]
+    out_df.to_csv(output_csv, index=False, encoding='utf-8')
+    return out_df, offset, header
+
+def run_search(kind, query, top_k=None, mark_active=True):
+    """Run a full search over the shared dataset and remember it (with the input offset covered) for tail refreshes.
+    Unless `mark_active` is False (a refresh re-running the saved search), it counts as this session's active search.
+    """
+    if mark_active:
+        st.session_state["search_runs"] = st.session_state.get("search_runs", 0) + 1
+    extra = {}
+    with shared_filtered()["search_lock"]:
+        if kind == "ranked":
+            result, offset, header = rank_by_description(query, top_k, FILTERED_CSV)
+            extra["top_k"] = int(top_k)
+        elif kind == "description":
+            result, offset, header = filter_by_description(query, FILTERED_CSV)
+        else:
+            result, offset, header = filter_by_pattern(query, FILTERED_CSV)
+        save_search_state(FILTERED_CSV, kind, query, offset, header=header, **extra)
+    return result
+
+def refresh_new_firs():
+    """Parse only FIRs appended to INPUT_CSV since the last load, match them against the
+    active search and merge the matches into FILTERED_CSV and the shared in-memory frame.
+    Returns the number of new matching rows, or None if a full re-run was needed.
+    """
+    # One refresh at a time: sessions whose auto-refresh sees the same growth would otherwise append the same tail
+    with shared_filtered()["search_lock"]:
+        state = load_search_state(FILTERED_CSV)
+        if not state or not os.path.exists(FILTERED_CSV) or not os.path.exists(INPUT_CSV):
+            return 0
+        tail, new_offset = read_tail_frame(INPUT_CSV, state["offset"], state.get("header"))
+        if tail is None:
+            # Input was rewritten rather than appended to; fall back to a full search
+            run_search(state["kind"], state["query"], state.get("top_k"), mark_active=False)
+            return None
+        if new_offset == state["offset"]:
+            return 0
+        if state["kind"] == "ranked":
+            # New rows can displace existing ones in the top-k, so re-rank (the shared index only indexes the tail)
+            ranked = run_search("ranked", state["query"], state.get("top_k"), mark_active=False)
+            # count by the tail's own rows: the shared frame may already hold rows synced by another session
+            return int(ranked["FIR_ID"].isin(tail["FIR_ID"]).sum())
+
+        matched = filter_frame(tail, search_patterns(state["kind"], state["query"]))
+        current = load_search_state(FILTERED_CSV)
+        if not current or current["offset"] != state["offset"]:
+            return 0  # another writer (e.g. a second server process) already merged this tail
+        if not matched.empty:
+            entry = shared_filtered()
+            with entry["lock"]:
+                in_sync = entry["frame"] is not None and entry["mtime"] == os.stat(FILTERED_CSV).st_mtime_ns
+                append_rows(FILTERED_CSV, matched)
+                if in_sync:
+                    # Copy-on-write: sessions still holding the previous frame/index are unaffected
+                    new_rows = add_derived_columns(matched.copy())
+                    index = entry["index"].extended(new_rows) if entry["index"] is not None else None
+                    entry.update(frame=pd.concat([entry["frame"], new_rows], ignore_index=True), index=index,
+                                 mtime=os.stat(FILTERED_CSV).st_mtime_ns, keyword_hits={})
+        save_search_state(FILTERED_CSV, state["kind"], state["query"], new_offset, header=state.get("header"))
+        return len(matched)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_snapshot(report_dir, scope, built_at):
+    """Pre-built report snapshot; `built_at` (from the manifest) is part of the cache key so rebuilds invalidate it."""
+    return load_snapshot(report_dir, scope)
+
+def lazy_expander(label, key):
+    """Expander whose body only runs while it is open."""
+    return st.expander(label, key=key, on_change="rerun")
+
+# --- Sidebar: Refresh ---
+st.sidebar.title("Data Refresh")
+auto_refresh = st.sidebar.checkbox("Auto-refresh newly registered FIRs", value=True)
+if st.sidebar.button("🔄 Refresh new FIRs") or auto_refresh:
+    added = refresh_new_firs()
+    if added is None:
+        st.sidebar.info("Search re-run on the full dataset.")
+    elif added:
+        st.sidebar.success(f"Merged {added} newly registered FIR(s).")
+
+if auto_refresh:
+    @st.fragment(run_every=AUTO_REFRESH_SECONDS)
+    def watch_input_csv():
+        # Cheap size check; trigger a full rerun (and thus a tail refresh) only when the input grew
+        state = load_search_state(FILTERED_CSV)
+        if state and os.path.exists(INPUT_CSV) and os.path.getsize(INPUT_CSV) != state["offset"]:
+            st.rerun()
+    watch_input_csv()
+
+# --- Sidebar: Reports ---
+report_manifest = load_manifest(REPORT_DIR)
+search_runs = st.session_state.get("search_runs", 0)  # searches this session has run (0 = no active search)
+show_reports = False
+if report_manifest is not None:
+    st.sidebar.title("Reports")
+    # Defaults to the pre-built reports until this session runs a search of its own
+    show_reports = st.sidebar.checkbox("Show pre-built division/station reports", value=not search_runs)
+    report_scope = st.sidebar.selectbox("Report scope", all_scopes(), format_func=scope_title, disabled=not show_reports)
+
 # --- Sidebar Filters ---
 st.sidebar.title("Filters")
+if show_reports:
+    st.sidebar.caption("Filters apply to search results; they are disabled while a report snapshot is shown.")
 if os.path.exists(FILTERED_CSV):
-    df_temp = pd.read_csv(FILTERED_CSV)  # Temp load for filter options
-    divisions = st.sidebar.multiselect("Select Police Divisions", options=df_temp['Police_Division'].dropna().unique(), default=df_temp['Police_Division'].dropna().unique())
-    stations = st.sidebar.multiselect("Select Police Stations", options=df_temp['Police_Station'].dropna().unique(), default=df_temp['Police_Station'].dropna().unique())
-
-    # Safely parse date bounds; handle NaT or missing values by falling back to sensible defaults
-    try:
-        df_temp['Date_of_FIR_Filing'] = pd.to_datetime(df_temp['Date_of_FIR_Filing'], errors='coerce')
-        min_ts = df_temp['Date_of_FIR_Filing'].min()
-        max_ts = df_temp['Date_of_FIR_Filing'].max()
-    except Exception:
+    df_temp = get_filtered_frame()  # Shared frame for filter options
+    fir_index = get_bitmap_index(df_temp)
+    # Filter options come from the index's value dictionaries, not a scan of the rows
+    division_opts = fir_index.values('Police_Division')
+    station_opts = fir_index.values('Police_Station')
+    divisions = st.sidebar.multiselect("Select Police Divisions", options=division_opts, default=division_opts, disabled=show_reports)
+    stations = st.sidebar.multiselect("Select Police Stations", options=station_opts, default=station_opts, disabled=show_reports)
+    acts = st.sidebar.multiselect("Criminal Acts (empty = all)", options=sorted(fir_index.values('Criminal_Act')), disabled=show_reports)
+    solved = st.sidebar.multiselect("Case Solved (empty = all)", options=sorted(fir_index.values('Case_Solved')), disabled=show_reports)
+    officers = st.sidebar.multiselect("Investigating Officers (empty = all)", options=sorted(fir_index.values('Investigating_Officer')), disabled=show_reports)
+    year_months = st.sidebar.multiselect("Year-Month (empty = all)", options=sorted(fir_index.values(YEAR_MONTH)), disabled=show_reports)
+    refine = st.sidebar.text_input("Refine by keyword (within results)", disabled=show_reports)
+
+    # Date bounds from the index's sorted dates; fall back to sensible defaults if there are none
+    if len(fir_index.sorted_dates):
+        min_ts = pd.Timestamp(fir_index.sorted_dates[0])
+        max_ts = pd.Timestamp(fir_index.sorted_dates[-1])
+    else:
         min_ts = None
         max_ts = None
 
@@ -56,14 +312,25 @@ if os.path.exists(FILTERED_CSV):
     # Convert to Python date objects for Streamlit's date_input
     start_date = pd.to_datetime(min_ts).date()
     end_date = pd.to_datetime(max_ts).date()
-    date_range = st.sidebar.date_input("Select Date Range", [start_date, end_date])
+    date_range = st.sidebar.date_input("Select Date Range", [start_date, end_date], disabled=show_reports)
 else:
     divisions = []
     stations = []
+    acts = solved = officers = year_months = []
+    refine = ""
     date_range = [None, None]
 
 # --- 1. Pattern Input ---
 st.title("🔍 FIR Pattern Analysis Dashboard")
+first_paint = startup_timer.mark("first_paint")
+with st.sidebar.expander("⏱️ Startup timings"):
+    st.write(f"Time to first paint: {first_paint:.3f}s (budget {startup_timer.budget:.1f}s)")
+    if IMPORT_TIMES:
+        st.write({name: f"{seconds:.3f}s" for name, seconds in IMPORT_TIMES.items()})
+    else:
+        st.caption("No deferred imports loaded yet in this process.")
+if startup_timer.over_budget("first_paint"):
+    st.sidebar.warning(f"First paint took {first_paint:.2f}s, over the {startup_timer.budget:.1f}s startup budget.")
 st.write("This app filters FIR records using the KMP algorithm and visualizes the results. (Internal Police Use Only)")
 
 pattern = st.text_input("Enter the keyword or pattern to search for (case-insensitive):")
@@ -74,7 +341,7 @@ if st.button("Run KMP Filtering"):
     else:
         st.info("Running KMP filter on dataset...")
         try:
-            filter_csv_by_pattern(INPUT_CSV, FILTERED_CSV, pattern)
+            run_search("pattern", pattern)
             st.success(f"Filtered rows saved to {FILTERED_CSV}")
         except Exception as e:
             st.error(f"Error during filtering: {e}")
@@ -83,69 +350,148 @@ if st.button("Run KMP Filtering"):
 st.subheader("OR: Paste full FIR description to auto-extract keywords")
 description = st.text_area("Paste FIR description here (the app will extract keywords and search the dataset):")
 
-def filter_by_description(desc, input_csv=INPUT_CSV, output_csv=FILTERED_CSV):
-    """Tokenize a long FIR description into keywords, then match against the 'Formatted' column using KMP.
-    Writes `output_csv` with rows that match any extracted keyword.
-    """
-    import re
-    # Extract alphanumeric tokens of length >=3
-    tokens = re.findall(r"\b[a-zA-Z0-9]{3,}\b", (desc or "").lower())
-    tokens = list(dict.fromkeys(tokens))  # preserve order, unique
-    if not tokens:
-        raise ValueError("No valid keywords found in description (need tokens length>=3).")
-
-    # Read CSV once and perform in-memory matching for efficiency
-    df_src = pd.read_csv(input_csv)
-    matched_rows = []
-    for _, row in df_src.iterrows():
-        formatted = (str(row.get('Formatted') or "")).lower()
-        for tok in tokens:
-            try:
-                if KMP(tok, formatted):
-                    matched_rows.append(row)
-                    break
-            except Exception:
-                # if KMP fails for any reason, skip this token/row
-                continue
-
-    if matched_rows:
-        out_df = pd.DataFrame(matched_rows)
-    else:
-        out_df = pd.DataFrame(columns=df_src.columns)
-
-    out_df.to_csv(output_csv, index=False, encoding='utf-8')
-    return out_df
+rcol1, rcol2 = st.columns([3, 1])
+with rcol1:
+    ranked_mode = st.checkbox("Rank by similarity (BM25) and keep only the top-k FIRs", value=False)
+with rcol2:
+    top_k = st.number_input("Top-k", min_value=1, max_value=100000, value=200, step=50, disabled=not ranked_mode)
 
 if st.button("Filter from Description (auto-extract keywords)"):
     if not description or not description.strip():
         st.warning("Please paste a FIR description to extract keywords from.")
+    elif ranked_mode:
+        st.info("Ranking FIRs by BM25 similarity...")
+        try:
+            outdf = run_search("ranked", description, top_k)
+            st.success(f"Top {len(outdf)} most similar FIRs saved to {FILTERED_CSV}")
+        except Exception as e:
+            st.error(f"Error ranking from description: {e}")
     else:
         st.info("Extracting keywords and running KMP matching...")
         try:
-            outdf = filter_by_description(description, INPUT_CSV, FILTERED_CSV)
+            outdf = run_search("description", description)
             st.success(f"Filtered rows saved to {FILTERED_CSV} ({len(outdf)} rows)")
         except Exception as e:
             st.error(f"Error filtering from description: {e}")
 
+# --- Watch-list: standing queries checked by register_fir_app.py on every new FIR ---
+watch_exp = lazy_expander("🔔 Watch-list alerts", key="watchlist_exp")
+with watch_exp:
+    if watch_exp.open:
+        alerts = read_recent_alerts(ALERT_LOG, limit=100)
+        if alerts:
+            st.write("Latest alerts (newest first):")
+            st.dataframe(pd.DataFrame(alerts), width="stretch")
+        else:
+            st.caption("No alerts yet.")
+
+        st.write("**Add a watch** (keywords and/or categories; empty categories match any value)")
+        with st.form("add_watch", clear_on_submit=True):
+            watch_name = st.text_input("Name")
+            watch_keywords = st.text_input("Keywords or phrases (comma-separated)")
+            watch_mode = st.radio("Keywords to match", ["any", "all"], horizontal=True)
+            wcol1, wcol2 = st.columns(2)
+            with wcol1:
+                watch_divisions = st.multiselect("Divisions", sorted(POLICE_STRUCTURE))
+                watch_stations = st.multiselect("Stations", sorted({s for d in POLICE_STRUCTURE.values() for s in d}))
+                watch_localities = st.multiselect("Localities", sorted({l for d in POLICE_STRUCTURE.values() for ls in d.values() for l in ls}))
+            with wcol2:
+                watch_acts = st.multiselect("Criminal Acts", sorted(CRIMINAL_ACTS))
+                watch_modi = st.multiselect("Modus Operandi", sorted({m for ms in CRIMINAL_ACTS.values() for m in ms}))
+            if st.form_submit_button("Save watch"):
+                query = make_query(watch_name.strip() or "Untitled watch", watch_keywords.split(","), watch_mode,
+                                   divisions=watch_divisions, stations=watch_stations, localities=watch_localities,
+                                   acts=watch_acts, modus_operandi=watch_modi)
+                if not (query["keywords"] or watch_divisions or watch_stations or watch_localities or watch_acts or watch_modi):
+                    st.warning("A watch needs at least one keyword or category.")
+                else:
+                    try:
+                        add_query(WATCHLIST_PATH, query)
+                        st.success(f"Saved watch '{query['name']}' ({query['id']}).")
+                    except Exception as e:
+                        st.error(f"Could not save the watch: {e}")
+
+        try:
+            queries = load_queries(WATCHLIST_PATH)
+        except Exception as e:
+            st.error(f"Could not read the watch-list {WATCHLIST_PATH}: {e}")
+            queries = []
+        if queries:
+            st.write(f"**{len(queries)} standing queries**")
+            st.dataframe(pd.DataFrame(queries), width="stretch")
+            remove_id = st.text_input("Remove watch by ID")
+            if st.button("Remove watch") and remove_id.strip():
+                remove_query(WATCHLIST_PATH, remove_id.strip())
+                st.rerun()
+
+# --- Pre-built Reports (static snapshots from reports.py, no per-request computation) ---
+# A search run just now (during this run, after the sidebar was drawn) takes precedence over the reports
+if show_reports and st.session_state.get("search_runs", 0) == search_runs:
+    snapshot = cached_snapshot(REPORT_DIR, report_scope, report_manifest["built_at"])
+    if snapshot is None:
+        st.warning("No snapshot for this scope yet. Run `python3 reports.py` to build the reports.")
+        st.stop()
+    st.subheader(f"📁 Report: {snapshot['title']}")
+    st.caption(f"Snapshot built {snapshot['built_at']}.")
+    if os.path.exists(INPUT_CSV) and os.path.getsize(INPUT_CSV) > report_manifest["offset"]:
+        st.info("New FIRs were registered since the last build. Run `python3 reports.py` to refresh the affected scopes.")
+
+    kpis = snapshot["kpis"]
+    k1, k2, k3, k4, k5 = st.columns(5)
+    k1.metric("Total FIRs", kpis["total_firs"])
+    k2.metric("Most Common Crime Type", kpis["top_crime"])
+    k3.metric("Active Stations", kpis["stations"])
+    k4.metric("Solved Cases (%)", f"{kpis['solved_pct']:.1f}%")
+    k5.metric("Total Victims", kpis["total_victims"])
+
+    charts = snapshot["charts"]
+    if charts:
+        rc1, rc2 = st.columns(2)
+        with rc1:
+            st.plotly_chart(px.line(charts["monthly"], x='Date_of_FIR_Filing', y='Count', title="Monthly FIR Trend"),
+                            width="stretch")
+            st.plotly_chart(px.bar(charts["by_area"], barmode='stack', title="FIRs by Area (Stacked by Solved Status)"),
+                            width="stretch")
+            acts_df = charts["acts"]
+            st.plotly_chart(px.bar(acts_df, y=acts_df.columns[0], title="FIRs by Criminal Act"), width="stretch")
+            st.plotly_chart(px.imshow(charts["day_month"], text_auto=True, title="FIRs by Day of Week and Month"),
+                            width="stretch")
+        with rc2:
+            st.plotly_chart(px.bar(charts["by_year"], barmode='stack', title="FIRs by Year (Stacked by Solved Status)"),
+                            width="stretch")
+            solved_df = charts["solved"]
+            st.plotly_chart(px.pie(solved_df, names=solved_df.index, values=solved_df.columns[0], title="Case Solved Status"),
+                            width="stretch")
+            st.plotly_chart(px.bar(charts["victims"], x='Total_Victims', y='Count', title="Distribution of Total Victims"),
+                            width="stretch")
+            st.plotly_chart(px.bar(charts["officers"], barmode='stack', title="Cases per Officer (Solved vs Unsolved)"),
+                            width="stretch")
+    st.stop()
+
 # --- 2. Load Filtered Data ---
 if os.path.exists(FILTERED_CSV):
-    df = pd.read_csv(FILTERED_CSV)
-    df['Date_of_FIR_Filing'] = pd.to_datetime(df['Date_of_FIR_Filing'], errors='coerce')
-    df['Total_Victims'] = df['Victim_Count_Female'] + df['Victim_Count_Male']
-    df['Total_Convicts'] = df['Convicted_Count_Male'] + df['Convicted_Count_Female']
-    df['Year'] = df['Date_of_FIR_Filing'].dt.year
-    df['Month'] = df['Date_of_FIR_Filing'].dt.month
-    df['Day_of_Week'] = df['Date_of_FIR_Filing'].dt.day_name()
-
-    # Apply Filters
-    df_filtered = df.copy()
-    if divisions:
-        df_filtered = df_filtered[df_filtered['Police_Division'].isin(divisions)]
-    if stations:
-        df_filtered = df_filtered[df_filtered['Police_Station'].isin(stations)]
-    if date_range[0] and date_range[1]:
-        df_filtered = df_filtered[(df_filtered['Date_of_FIR_Filing'] >= pd.to_datetime(date_range[0])) & 
-                                  (df_filtered['Date_of_FIR_Filing'] <= pd.to_datetime(date_range[1]))]
+    df = get_filtered_frame()
+
+    # Apply Filters: resolved on bitmaps (OR within a filter, AND across filters), rows are gathered once at the end
+    fir_index = get_bitmap_index(df)
+    selections = {
+        'Police_Division': divisions,
+        'Police_Station': stations,
+        'Criminal_Act': acts,
+        'Case_Solved': solved,
+        'Investigating_Officer': officers,
+        YEAR_MONTH: year_months,
+    }
+    dates = tuple(date_range) if len(date_range) == 2 else None
+    keyword_hits = None
+    if refine.strip():
+        # keyword search results as a bitmap, intersected with the categorical filters
+        try:
+            keyword_hits = get_keyword_hits(df, refine)
+        except ValueError as e:
+            st.sidebar.warning(f"Refine keyword ignored: {e}")
+    selected = fir_index.select(selections, dates, keyword_hits)
+    df_filtered = df if selected is None else df.iloc[selected.to_array()]
 
     st.success(f"Loaded {len(df_filtered)} filtered FIR records after applying filters.")
 else:
@@ -178,177 +524,244 @@ if division_col in df_filtered:
     k3.metric("Active Divisions", df_filtered[division_col].nunique())
 k4.metric("Solved Cases (%)", f"{(df_filtered[solved_col].value_counts(normalize=True).get('Yes', 0) * 100):.1f}%")
 
-# --- 5. Map Visualization ---
-st.subheader("🗺️ Geographical Hotspots")
-if lat_col and lon_col and not df_filtered[lat_col].isna().all():
-    fig_map = px.scatter_mapbox(df_filtered, lat=lat_col, lon=lon_col,
-        hover_name=crime_col, color=crime_col, zoom=6, height=500)
-    fig_map.update_layout(mapbox_style="open-street-map", margin={"r":0,"t":0,"l":0,"b":0})
-    st.plotly_chart(fig_map, use_container_width=True)
-else:
-    st.info("No latitude/longitude data found for mapping. Using location-based charts instead.")
+# --- Chart Helpers ---
+# Identifies the data behind df_filtered; chart summaries are memoized on it instead of hashing the frame
+filter_key = (FILTERED_CSV, st.session_state.get("fir_df_mtime"), len(df), tuple(divisions), tuple(stations), tuple(acts),
+              tuple(solved), tuple(officers), tuple(year_months), refine, tuple(date_range))
 
-# --- Temporal Visualizations ---
-st.subheader("📅 Temporal Analysis")
-
-col1, col2 = st.columns(2)
-
-# Crime Frequency Over Time (Existing, enhanced with filters)
-if date_col in df_filtered:
-    with col1:
-        time_series = df_filtered.groupby(df_filtered[date_col].dt.to_period("M")).size().reset_index(name="Count")
-        time_series[date_col] = time_series[date_col].astype(str)
-        fig_ts = px.line(time_series, x=date_col, y="Count", title="Crime Frequency Over Time (Monthly)")
-        st.plotly_chart(fig_ts, use_container_width=True)
-
-# Bar Chart: FIRs by Year
-with col2:
-    yearly = df_filtered.groupby(['Year', solved_col]).size().unstack().fillna(0)
-    fig_year = px.bar(yearly, barmode='stack', title="FIRs by Year (Stacked by Solved Status)")
-    st.plotly_chart(fig_year, use_container_width=True)
-
-# Heatmap Calendar: FIRs by Day of Week/Month
-if not df_filtered.empty:
-    pivot = df_filtered.pivot_table(index='Day_of_Week', columns='Month', aggfunc='size', fill_value=0)
-    fig_heat, ax = plt.subplots(figsize=(10, 5))
-    sns.heatmap(pivot, annot=True, cmap="YlGnBu", ax=ax)
-    ax.set_title("FIRs by Day of Week and Month")
-    st.pyplot(fig_heat)
-
-# --- Location/Categorical Visualizations ---
-st.subheader("📍 Location and Categorical Analysis")
-
-col3, col4 = st.columns(2)
-
-# Bar Chart: FIRs by Police Division
-with col3:
-    div_counts = df_filtered.groupby([division_col, solved_col]).size().unstack().fillna(0)
-    fig_div = px.bar(div_counts, orientation='h', barmode='stack', title="FIRs by Police Division")
-    st.plotly_chart(fig_div, use_container_width=True)
-
-# Pie Chart: Distribution by Police Station
-with col4:
-    station_counts = df_filtered[station_col].value_counts()
-    fig_pie_station = px.pie(names=station_counts.index, values=station_counts.values, title="Distribution by Police Station")
-    st.plotly_chart(fig_pie_station, use_container_width=True)
-
-# Treemap: Hierarchy of Locations
-if not df_filtered.empty:
-    treemap_df = df_filtered.groupby([division_col, station_col, locality_col]).size().reset_index(name='Count')
-    fig_tree = px.treemap(treemap_df, path=[division_col, station_col, locality_col], values='Count', title="Location Hierarchy Treemap")
-    st.plotly_chart(fig_tree, use_container_width=True)
-
-col5, col6 = st.columns(2)
-
-# Bar Chart: FIRs by Criminal Activity Type
-with col5:
-    if activity_col in df_filtered and not df_filtered[activity_col].dropna().empty:
-        act_counts = df_filtered[activity_col].value_counts()
-        act_df = act_counts.reset_index()
-        act_df.columns = [activity_col, 'count']
-        fig_act = px.bar(act_df, x=activity_col, y='count', title="FIRs by Criminal Activity (Individual vs Gang)")
-        st.plotly_chart(fig_act, use_container_width=True)
-    else:
-        st.info("No criminal activity data available.")
+@st.cache_data(show_spinner=False, max_entries=512)
+def chart_summary(name, key, _frame, *args):
+    """Memoized `chart_data.<name>(frame, *args)`; `key` is the filter state, the frame itself is not hashed."""
+    return getattr(chart_data, name)(_frame, *args)
 
-# Pie Chart: Case Solved Status
-with col6:
-    solved_counts = df_filtered[solved_col].value_counts()
-    fig_pie_solved = px.pie(names=solved_counts.index, values=solved_counts.values, title="Case Solved Status")
-    st.plotly_chart(fig_pie_solved, use_container_width=True)
+def summary(name, *args):
+    return chart_summary(name, filter_key, df_filtered, *args)
 
-# Bar Chart: Cases by Investigating Officer
-officer_counts = df_filtered.groupby([officer_col, solved_col]).size().unstack().fillna(0)
-fig_officer = px.bar(officer_counts, barmode='stack', title="Cases by Investigating Officer")
-st.plotly_chart(fig_officer, use_container_width=True)
+def box_figure(stats, by, title):
+    """Box plot drawn from precomputed quartiles/fences (no per-row data sent to the browser)."""
+    fig = go.Figure(go.Box(x=stats[by], q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+                           lowerfence=stats["lowerfence"], upperfence=stats["upperfence"], boxpoints=False))
+    fig.update_layout(title=title, xaxis_title=by)
+    return fig
 
-# Bar Chart: Victim Gender Distribution
-gender_counts = df_filtered[victim_gender_col].value_counts()
-fig_gender = px.bar(x=gender_counts.index, y=gender_counts.values, title="Victim Gender Distribution")
-st.plotly_chart(fig_gender, use_container_width=True)
+# --- Analysis Sections (each tab is only computed while it is selected) ---
+tab_time, tab_loc, tab_num, tab_rel, tab_kw, tab_map = st.tabs(
+    ["📅 Temporal", "📍 Location & Categories", "🔢 Victims & Convicts", "🔗 Relational", "🗣️ Keywords", "🗺️ Map"],
+    key="analysis_tab", on_change="rerun")
 
-# --- Numerical Visualizations (Victim/Convict) ---
-st.subheader("🔢 Victim and Convict Analysis")
-
-col7, col8 = st.columns(2)
-
-# Histogram: Distribution of Total Victims
-with col7:
-    fig_hist_vict = px.histogram(df_filtered, x='Total_Victims', title="Distribution of Total Victims per FIR")
-    st.plotly_chart(fig_hist_vict, use_container_width=True)
-
-# Box Plot: Victim Counts by Division
-with col8:
-    fig_box_vict = px.box(df_filtered, x=division_col, y='Total_Victims', title="Victim Counts by Division")
-    st.plotly_chart(fig_box_vict, use_container_width=True)
-
-# Stacked Bar: Victims by Gender and Division
-victim_sums = df_filtered.groupby(division_col)[['Victim_Count_Female', 'Victim_Count_Male']].sum()
-fig_stack_vict = px.bar(victim_sums, barmode='stack', title="Victims by Gender and Division")
-st.plotly_chart(fig_stack_vict, use_container_width=True)
-
-# Similar for Convicted Counts
-col9, col10 = st.columns(2)
-
-# Histogram: Distribution of Total Convicts
-with col9:
-    fig_hist_conv = px.histogram(df_filtered, x='Total_Convicts', title="Distribution of Total Convicts per FIR")
-    st.plotly_chart(fig_hist_conv, use_container_width=True)
+# --- Temporal Visualizations ---
+with tab_time:
+    if tab_time.open:
+        st.subheader("📅 Temporal Analysis")
+        col1, col2 = st.columns(2)
+
+        # Crime Frequency Over Time (Existing, enhanced with filters)
+        if date_col in df_filtered:
+            with col1:
+                time_series = summary("monthly_counts")
+                fig_ts = px.line(time_series, x=date_col, y="Count", title="Crime Frequency Over Time (Monthly)")
+                st.plotly_chart(fig_ts, width="stretch")
+
+        # Bar Chart: FIRs by Year
+        with col2:
+            yearly = summary("counts_by_solved", 'Year')
+            fig_year = px.bar(yearly, barmode='stack', title="FIRs by Year (Stacked by Solved Status)")
+            st.plotly_chart(fig_year, width="stretch")
+
+        # Heatmap Calendar: FIRs by Day of Week/Month
+        heat_exp = lazy_expander("FIRs by Day of Week and Month (heatmap)", key="heatmap_exp")
+        with heat_exp:
+            if heat_exp.open and not df_filtered.empty:
+                pivot = summary("day_month_pivot")
+                fig_heat, ax = plt.subplots(figsize=(10, 5))
+                sns.heatmap(pivot, annot=True, cmap="YlGnBu", ax=ax)
+                ax.set_title("FIRs by Day of Week and Month")
+                st.pyplot(fig_heat)
+                plt.close(fig_heat)
 
-# Box Plot: Convict Counts by Division
-with col10:
-    fig_box_conv = px.box(df_filtered, x=division_col, y='Total_Convicts', title="Convict Counts by Division")
-    st.plotly_chart(fig_box_conv, use_container_width=True)
+# --- Location/Categorical Visualizations ---
+with tab_loc:
+    if tab_loc.open:
+        st.subheader("📍 Location and Categorical Analysis")
+        col3, col4 = st.columns(2)
+
+        # Bar Chart: FIRs by Police Division
+        with col3:
+            div_counts = summary("counts_by_solved", division_col)
+            fig_div = px.bar(div_counts, orientation='h', barmode='stack', title="FIRs by Police Division")
+            st.plotly_chart(fig_div, width="stretch")
+
+        # Pie Chart: Distribution by Police Station
+        with col4:
+            station_counts = summary("value_counts", station_col)
+            fig_pie_station = px.pie(names=station_counts.index, values=station_counts.values, title="Distribution by Police Station")
+            st.plotly_chart(fig_pie_station, width="stretch")
+
+        # Treemap: Hierarchy of Locations
+        tree_exp = lazy_expander("Location Hierarchy Treemap", key="treemap_exp")
+        with tree_exp:
+            if tree_exp.open and not df_filtered.empty:
+                treemap_df = summary("location_tree", (division_col, station_col, locality_col))
+                fig_tree = px.treemap(treemap_df, path=[division_col, station_col, locality_col], values='Count', title="Location Hierarchy Treemap")
+                st.plotly_chart(fig_tree, width="stretch")
+
+        col5, col6 = st.columns(2)
+
+        # Bar Chart: FIRs by Criminal Activity Type
+        with col5:
+            if activity_col in df_filtered and not df_filtered[activity_col].dropna().empty:
+                act_df = summary("value_counts", activity_col).reset_index()
+                act_df.columns = [activity_col, 'count']
+                fig_act = px.bar(act_df, x=activity_col, y='count', title="FIRs by Criminal Activity (Individual vs Gang)")
+                st.plotly_chart(fig_act, width="stretch")
+            else:
+                st.info("No criminal activity data available.")
+
+        # Pie Chart: Case Solved Status
+        with col6:
+            solved_counts = summary("value_counts", solved_col)
+            fig_pie_solved = px.pie(names=solved_counts.index, values=solved_counts.values, title="Case Solved Status")
+            st.plotly_chart(fig_pie_solved, width="stretch")
+
+        # Bar Chart: Cases by Investigating Officer
+        officer_counts = summary("counts_by_solved", officer_col)
+        fig_officer = px.bar(officer_counts, barmode='stack', title="Cases by Investigating Officer")
+        st.plotly_chart(fig_officer, width="stretch")
+
+        # Bar Chart: Victim Gender Distribution
+        gender_counts = summary("value_counts", victim_gender_col)
+        fig_gender = px.bar(x=gender_counts.index, y=gender_counts.values, title="Victim Gender Distribution")
+        st.plotly_chart(fig_gender, width="stretch")
 
-# Stacked Bar: Convicts by Gender and Division
-convict_sums = df_filtered.groupby(division_col)[['Convicted_Count_Female', 'Convicted_Count_Male']].sum()
-fig_stack_conv = px.bar(convict_sums, barmode='stack', title="Convicts by Gender and Division")
-st.plotly_chart(fig_stack_conv, use_container_width=True)
+# --- Numerical Visualizations (Victim/Convict) ---
+# Histograms and box plots are drawn from pre-binned counts and per-division quartiles, not raw rows
+with tab_num:
+    if tab_num.open:
+        st.subheader("🔢 Victim and Convict Analysis")
+        col7, col8 = st.columns(2)
+
+        # Histogram: Distribution of Total Victims
+        with col7:
+            vict_bins = summary("histogram_bins", 'Total_Victims')
+            fig_hist_vict = px.bar(vict_bins, x='Total_Victims', y='Count', title="Distribution of Total Victims per FIR")
+            st.plotly_chart(fig_hist_vict, width="stretch")
+
+        # Box Plot: Victim Counts by Division
+        with col8:
+            vict_box = summary("box_stats", division_col, 'Total_Victims')
+            if not vict_box.empty:
+                st.plotly_chart(box_figure(vict_box, division_col, "Victim Counts by Division"), width="stretch")
+
+        # Stacked Bar: Victims by Gender and Division
+        victim_sums = summary("sums_by", division_col, ('Victim_Count_Female', 'Victim_Count_Male'))
+        fig_stack_vict = px.bar(victim_sums, barmode='stack', title="Victims by Gender and Division")
+        st.plotly_chart(fig_stack_vict, width="stretch")
+
+        # Similar for Convicted Counts
+        col9, col10 = st.columns(2)
+
+        # Histogram: Distribution of Total Convicts
+        with col9:
+            conv_bins = summary("histogram_bins", 'Total_Convicts')
+            fig_hist_conv = px.bar(conv_bins, x='Total_Convicts', y='Count', title="Distribution of Total Convicts per FIR")
+            st.plotly_chart(fig_hist_conv, width="stretch")
+
+        # Box Plot: Convict Counts by Division
+        with col10:
+            conv_box = summary("box_stats", division_col, 'Total_Convicts')
+            if not conv_box.empty:
+                st.plotly_chart(box_figure(conv_box, division_col, "Convict Counts by Division"), width="stretch")
+
+        # Stacked Bar: Convicts by Gender and Division
+        convict_sums = summary("sums_by", division_col, ('Convicted_Count_Female', 'Convicted_Count_Male'))
+        fig_stack_conv = px.bar(convict_sums, barmode='stack', title="Convicts by Gender and Division")
+        st.plotly_chart(fig_stack_conv, width="stretch")
 
 # --- Relational Visualizations ---
-st.subheader("🔗 Relational Analysis")
-
-# Scatter Plot: Victims vs. Convicts
-# fig_scatter = px.scatter(df_filtered, x='Total_Victims', y='Total_Convicts', color=solved_col, 
-#                          hover_data=[division_col], title="Victims vs. Convicts (Colored by Solved Status)")
-# st.plotly_chart(fig_scatter, use_container_width=True)
-
-# Correlation Heatmap (Existing)
-# num_df = df_filtered.select_dtypes(include=[np.number])
-# if not num_df.empty:
-#     fig_corr = px.imshow(num_df.corr(), text_auto=True, aspect="auto", title="Numeric Feature Correlation")
-#     st.plotly_chart(fig_corr, use_container_width=True)
-# else:
-#     st.info("No numeric columns found for correlation analysis.")
-
-# --- Top Crimes (Existing, adapted) ---
-if crime_col in df_filtered:
-    st.subheader("Top Crime Categories")
-    top10 = df_filtered[crime_col].value_counts().nlargest(10)
-    fig_bar = px.bar(x=top10.values, y=top10.index, orientation="h", labels={"x":"Count", "y":"Crime Type"})
-    st.plotly_chart(fig_bar, use_container_width=True)
-
-# --- Word Cloud (Existing, enhanced) ---
-# st.subheader("🗣️ Keyword Density (Word Cloud)")
-# if desc_col in df_filtered:
-#     text = " ".join(df_filtered[desc_col].dropna().astype(str))
-#     if text.strip():
-#         wc = WordCloud(width=800, height=400, background_color="white", stopwords=["sexual", "harassment", "stalking"]).generate(text)  # Enhanced with custom stopwords
-#         fig, ax = plt.subplots(figsize=(10,5))
-#         ax.imshow(wc, interpolation="bilinear")
-#         ax.axis("off")
-#         st.pyplot(fig)
-#     else:
-#         st.info("No descriptive text found.")
-# else:
-#     st.info("No descriptive column found for word cloud.")
+with tab_rel:
+    if tab_rel.open:
+        st.subheader("🔗 Relational Analysis")
+
+        # Scatter Plot: Victims vs. Convicts
+        # fig_scatter = px.scatter(df_filtered, x='Total_Victims', y='Total_Convicts', color=solved_col,
+        #                          hover_data=[division_col], title="Victims vs. Convicts (Colored by Solved Status)")
+        # st.plotly_chart(fig_scatter, width="stretch")
+
+        # Correlation Heatmap (Existing)
+        # num_df = df_filtered.select_dtypes(include=[np.number])
+        # if not num_df.empty:
+        #     fig_corr = px.imshow(num_df.corr(), text_auto=True, aspect="auto", title="Numeric Feature Correlation")
+        #     st.plotly_chart(fig_corr, width="stretch")
+        # else:
+        #     st.info("No numeric columns found for correlation analysis.")
+
+        # --- Top Crimes (Existing, adapted) ---
+        if crime_col in df_filtered:
+            st.subheader("Top Crime Categories")
+            top10 = summary("value_counts", crime_col, 10)
+            fig_bar = px.bar(x=top10.values, y=top10.index, orientation="h", labels={"x":"Count", "y":"Crime Type"})
+            st.plotly_chart(fig_bar, width="stretch")
+
+# --- Word Cloud & Top Terms (from the incremental term-frequency store) ---
+with tab_kw:
+    if tab_kw.open:
+        st.subheader("🗣️ Keyword Density (Word Cloud)")
+        try:
+            term_offset = sync_term_store(INPUT_CSV, TERM_DB)
+            # Date range maps onto the store's year-month groups unless months were picked explicitly
+            term_months = year_months
+            if not term_months and len(date_range) == 2 and date_range[0] and date_range[1]:
+                term_months = list(pd.period_range(date_range[0], date_range[1], freq="M").strftime("%Y-%m"))
+            terms = cached_top_terms(TERM_DB, term_offset, 200, tuple(divisions), tuple(stations), tuple(acts), tuple(term_months))
+        except Exception as e:
+            terms = []
+            st.error(f"Could not load term counts: {e}")
+
+        if terms:
+            st.caption("Term counts over the whole dataset for the selected divisions, stations, acts and months.")
+            wc_col, table_col = st.columns([2, 1])
+            with wc_col:
+                wc = wordcloud.WordCloud(width=800, height=400, background_color="white").generate_from_frequencies(dict(terms))
+                fig, ax = plt.subplots(figsize=(10, 5))
+                ax.imshow(wc, interpolation="bilinear")
+                ax.axis("off")
+                st.pyplot(fig)
+                plt.close(fig)
+            with table_col:
+                st.dataframe(pd.DataFrame(terms[:25], columns=["Term", "Count"]), hide_index=True)
+        else:
+            st.info("No descriptive text found.")
+
+# --- Map Visualization ---
+with tab_map:
+    if tab_map.open:
+        st.subheader("🗺️ Geographical Hotspots")
+        if lat_col and lon_col and not df_filtered[lat_col].isna().all():
+            # Markers aggregated on a lat/lon grid, sized by FIR count
+            points = summary("map_points", lat_col, lon_col, crime_col)
+            fig_map = px.scatter_mapbox(points, lat=lat_col, lon=lon_col, size="Count",
+                hover_name=crime_col, color=crime_col, zoom=6, height=500)
+            fig_map.update_layout(mapbox_style="open-street-map", margin={"r":0,"t":0,"l":0,"b":0})
+            st.plotly_chart(fig_map, width="stretch")
+        else:
+            st.info("No latitude/longitude data found for mapping. Using location-based charts instead.")
 
 # --- 10. Data Preview & Download ---
 st.subheader("Data Preview")
 st.dataframe(df_filtered.head(50))
-csv_buf = io.StringIO()
-df_filtered.to_csv(csv_buf, index=False)
-st.download_button("Download Filtered CSV", data=csv_buf.getvalue(), file_name="filtered_fir.csv", mime="text/csv")
+
+# Export is generated only when the download is clicked: chunked to a temp file that is removed right after.
+# The finished file is served from memory, so large results are only offered compressed.
+ecol1, ecol2 = st.columns([2, 1])
+with ecol1:
+    export_fmt = st.selectbox("Export format", options=export_formats(len(df_filtered)),
+                              format_func=lambda f: EXPORT_FORMATS[f][0])
+    if len(df_filtered) > LARGE_EXPORT_ROWS:
+        st.caption(f"Over {LARGE_EXPORT_ROWS:,} rows: plain CSV is not offered; narrow the filters to export it.")
+with ecol2:
+    # bind this run's frame and format; the callable runs on a separate thread at click time
+    st.download_button("Download Filtered Data", data=lambda frame=df_filtered, fmt=export_fmt: export_bytes(frame, fmt),
+                       file_name=f"filtered_fir.{export_fmt}", mime=EXPORT_FORMATS[export_fmt][1])
 
 st.markdown("---")
 st.caption("Internal Police Analytics Dashboard — uses KMP for FIR pattern filtering. Run securely on intranet.")
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Bitmap Indexes for Sidebar Filters
+----------------------------------
+Roaring-style compressed bitmaps over row positions, one per distinct value
+of the categorical filter columns (and per year-month), so that any
+combination of sidebar filters is resolved with bitwise AND/OR before a
+single row of the frame is touched.
+
+Row ids are split into chunks of 2^16 rows. Each chunk is stored as either
+  - a sorted uint16 array of the low bits (sparse, <= 4096 rows), or
+  - a 1024-word uint64 bitmap (dense),
+and operations pick the cheapest container pairing, as in Roaring.
+"""
+
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ("Police_Division", "Police_Station", "Criminal_Act", "Case_Solved", "Investigating_Officer")
+YEAR_MONTH = "Year_Month"
+DATE_COLUMN = "Date_of_FIR_Filing"
+
+ARRAY_MAX = 4096
+BITMAP_WORDS = 1 << 10  # 65536 bits
+
+
+def _to_bitmap(arr):
+    words = np.zeros(BITMAP_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(words, arr >> 6, np.left_shift(np.uint64(1), (arr & 63).astype(np.uint64)))
+    return words
+
+
+def _bitmap_values(words):
+    bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _bitmap_card(words):
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def _compact(words):
+    """Store a dense container as an array when it has become sparse (None when empty)."""
+    card = _bitmap_card(words)
+    if card == 0:
+        return None
+    return _bitmap_values(words) if card <= ARRAY_MAX else words
+
+
+def _and(a, b):
+    a_arr, b_arr = a.dtype == np.uint16, b.dtype == np.uint16
+    if a_arr and b_arr:
+        out = np.intersect1d(a, b, assume_unique=True)
+        return out if len(out) else None
+    if a_arr or b_arr:
+        arr, words = (a, b) if a_arr else (b, a)
+        hit = (words[arr >> 6] >> (arr & 63).astype(np.uint64)) & np.uint64(1)
+        out = arr[hit.astype(bool)]
+        return out if len(out) else None
+    return _compact(a & b)
+
+
+def _or(a, b):
+    a_arr, b_arr = a.dtype == np.uint16, b.dtype == np.uint16
+    if a_arr and b_arr:
+        out = np.union1d(a, b)
+        return out if len(out) <= ARRAY_MAX else _to_bitmap(out)
+    if a_arr or b_arr:
+        arr, words = (a, b) if a_arr else (b, a)
+        words = words.copy()
+        np.bitwise_or.at(words, arr >> 6, np.left_shift(np.uint64(1), (arr & 63).astype(np.uint64)))
+        return words
+    return a | b
+
+
+class RoaringBitmap:
+    __slots__ = ("containers",)
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}  # chunk number -> uint16 array or uint64 bitmap
+
+    @classmethod
+    def from_sorted(cls, ids):
+        """Build from sorted, unique non-negative row positions."""
+        ids = np.asarray(ids, dtype=np.int64)
+        containers = {}
+        if len(ids):
+            highs = ids >> 16
+            keys, starts = np.unique(highs, return_index=True)
+            bounds = list(starts[1:]) + [len(ids)]
+            for key, start, end in zip(keys, starts, bounds):
+                low = (ids[start:end] & 0xFFFF).astype(np.uint16)
+                containers[int(key)] = low if len(low) <= ARRAY_MAX else _to_bitmap(low)
+        return cls(containers)
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Bitmap of the True positions of a boolean mask (e.g. keyword-search hits)."""
+        return cls.from_sorted(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def __and__(self, other):
+        out = {}
+        for key in self.containers.keys() & other.containers.keys():
+            c = _and(self.containers[key], other.containers[key])
+            if c is not None:
+                out[key] = c
+        return RoaringBitmap(out)
+
+    def __or__(self, other):
+        out = dict(self.containers)
+        for key, c in other.containers.items():
+            out[key] = _or(out[key], c) if key in out else c
+        return RoaringBitmap(out)
+
+    def __len__(self):
+        return sum(len(c) if c.dtype == np.uint16 else _bitmap_card(c) for c in self.containers.values())
+
+    def to_array(self):
+        """Sorted row positions as an int64 array."""
+        parts = []
+        for key in sorted(self.containers):
+            c = self.containers[key]
+            low = c if c.dtype == np.uint16 else _bitmap_values(c)
+            parts.append(low.astype(np.int64) + (key << 16))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def union_all(bitmaps):
+    result = RoaringBitmap()
+    for bm in bitmaps:
+        result = result | bm
+    return result
+
+
+def year_month(dates):
+    """"YYYY-MM" labels of a datetime Series (NaN for NaT). Keyed on year*100+month so that
+    only the distinct months are formatted (strftime per row is far too slow for millions of rows).
+    """
+    keys = dates.dt.year * 100 + dates.dt.month
+    codes, uniques = pd.factorize(keys)
+    labels = np.array([f"{int(k) // 100:04d}-{int(k) % 100:02d}" for k in uniques] + [np.nan], dtype=object)
+    # NaT gets code -1, which picks the trailing NaN entry
+    return pd.Series(labels[codes], index=dates.index)
+
+
+class BitmapIndex:
+    """Per-value bitmaps for INDEX_COLUMNS and year-month, plus a date-sorted permutation for day ranges."""
+
+    def __init__(self, columns=INDEX_COLUMNS):
+        self.columns = tuple(columns)
+        self.bitmaps = {col: {} for col in self.columns + (YEAR_MONTH,)}
+        self.nulls = {col: 0 for col in self.bitmaps}
+        self.n_rows = 0
+        self.sorted_dates = np.empty(0, dtype="datetime64[ns]")
+        self.date_order = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, frame, columns=INDEX_COLUMNS):
+        index = cls(columns)
+        index.append(frame)
+        return index
+
+    def append(self, frame):
+        """Index rows of `frame` as positions n_rows.. (appending to an already indexed frame)."""
+        start = self.n_rows
+        dates = pd.to_datetime(frame[DATE_COLUMN], errors="coerce") if DATE_COLUMN in frame else None
+        for col in self.columns + (YEAR_MONTH,):
+            if col == YEAR_MONTH:
+                if dates is None:
+                    continue
+                values = year_month(dates)
+            elif col in frame:
+                values = frame[col]
+            else:
+                continue
+            codes, uniques = pd.factorize(values)
+            self.nulls[col] += int((codes < 0).sum())
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            bounds = np.searchsorted(sorted_codes, np.arange(len(uniques) + 1))
+            for i, value in enumerate(uniques):
+                ids = order[bounds[i]:bounds[i + 1]] + start
+                bm = RoaringBitmap.from_sorted(ids)
+                existing = self.bitmaps[col].get(value)
+                self.bitmaps[col][value] = existing | bm if existing is not None else bm
+
+        if dates is not None:
+            valid = dates.notna().to_numpy()
+            tail_dates = dates.to_numpy(dtype="datetime64[ns]")[valid]
+            tail_ids = np.flatnonzero(valid) + start
+            order = np.argsort(tail_dates, kind="stable")
+            tail_dates, tail_ids = tail_dates[order], tail_ids[order]
+            at = np.searchsorted(self.sorted_dates, tail_dates, side="right")
+            self.sorted_dates = np.insert(self.sorted_dates, at, tail_dates)
+            self.date_order = np.insert(self.date_order, at, tail_ids)
+        self.n_rows += len(frame)
+        return self
+
+    def extended(self, frame):
+        """A copy of this index with `frame` appended; the original is left untouched (bitmaps are immutable)."""
+        clone = BitmapIndex(self.columns)
+        clone.bitmaps = {col: dict(values) for col, values in self.bitmaps.items()}
+        clone.nulls = dict(self.nulls)
+        clone.n_rows = self.n_rows
+        clone.sorted_dates = self.sorted_dates
+        clone.date_order = self.date_order
+        return clone.append(frame)
+
+    def values(self, col):
+        return list(self.bitmaps[col].keys())
+
+    def any_of(self, col, values):
+        """OR of the bitmaps of `values` in `col`; None means "no restriction" (all values of a null-free column)."""
+        known = self.bitmaps[col]
+        wanted = [v for v in dict.fromkeys(values) if v in known]
+        if len(wanted) == len(known) and not self.nulls[col]:
+            return None
+        return union_all(known[v] for v in wanted)
+
+    def date_between(self, start, end):
+        """Rows with start <= date <= end, via the date-sorted permutation; None if that is every row."""
+        start, end = np.datetime64(pd.Timestamp(start), "ns"), np.datetime64(pd.Timestamp(end), "ns")
+        dates = self.sorted_dates
+        if len(dates) == self.n_rows and (not len(dates) or (start <= dates[0] and end >= dates[-1])):
+            return None  # range covers every date and no row has a missing date
+        lo = np.searchsorted(dates, start, side="left")
+        hi = np.searchsorted(dates, end, side="right")
+        return RoaringBitmap.from_sorted(np.sort(self.date_order[lo:hi]))
+
+    def select(self, selections, date_range=None, extra=None):
+        """Resolve a filter combination to a bitmap (None = every row).
+
+        `selections` maps column -> selected values (empty/None = no filter on that column,
+        OR within a column, AND across columns). `date_range` is an inclusive (start, end)
+        pair; `extra` is an optional bitmap (e.g. keyword-search hits) to intersect with.
+        """
+        parts = []
+        for col, values in selections.items():
+            if values and col in self.bitmaps:
+                bm = self.any_of(col, values)
+                if bm is not None:
+                    parts.append(bm)
+        if date_range and date_range[0] is not None and date_range[1] is not None:
+            bm = self.date_between(*date_range)
+            if bm is not None:
+                parts.append(bm)
+        if extra is not None:
+            parts.append(extra)
+        if not parts:
+            return None
+        parts.sort(key=len)  # intersect smallest first
+        result = parts[0]
+        for bm in parts[1:]:
+            result = result & bm
+        return result
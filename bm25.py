@@ -0,0 +1,155 @@
+"""
+BM25 Ranked Retrieval
+---------------------
+Inverted index with precomputed term statistics for ranking FIRs against
+a free-text description, as an alternative to the unranked "match any
+keyword" filter in `app.py`.
+
+Postings are kept in document order, so newly appended FIRs can be added
+without rebuilding. Top-k retrieval uses a min-heap and MaxScore-style
+early termination: once the heap is full, query terms whose combined
+score upper bound cannot beat the current k-th score no longer drive
+candidate generation, and partially scored documents are dropped as soon
+as they cannot enter the heap.
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+
+from Formatting import split_tokens, tokenize as normalized_tokens
+
+# Columns concatenated into the searchable text of each FIR
+DOC_COLUMNS = ("Formatted", "FIR_Description")
+
+
+def tokenize(text):
+    """Normalized tokens (see `Formatting.tokenize`) of length >= 3, same rule as `KMP.extract_keywords`."""
+    return [t for t in normalized_tokens(text or "") if len(t) >= 3]
+
+
+def document_tokens(text):
+    """`tokenize` without the memo: each document is tokenized once, and caching it would only evict query entries."""
+    return [t for t in split_tokens(text or "") if len(t) >= 3]
+
+
+class BM25Index:
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> ([doc_id, ...], [tf, ...]) in increasing doc_id order
+        self.max_tf = {}    # term -> largest tf in its postings
+        self.min_dl = {}    # term -> shortest document containing the term
+        self.doc_len = []
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def add_documents(self, texts):
+        """Index documents; ids continue from the current document count."""
+        for text in texts:
+            doc_id = len(self.doc_len)
+            tokens = document_tokens(text)
+            dl = len(tokens)
+            self.doc_len.append(dl)
+            self.total_len += dl
+            counts = {}
+            for tok in tokens:
+                counts[tok] = counts.get(tok, 0) + 1
+            for term, tf in counts.items():
+                ids, tfs = self.postings.setdefault(term, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+                if tf > self.max_tf.get(term, 0):
+                    self.max_tf[term] = tf
+                if dl < self.min_dl.get(term, dl + 1):
+                    self.min_dl[term] = dl
+
+    def idf(self, term):
+        n = len(self.doc_len)
+        df = len(self.postings[term][0])
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _tf_part(self, tf, dl, avgdl):
+        return tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))
+
+    def top_k(self, query_terms, k=200):
+        """Return up to `k` (score, doc_id) pairs, best first (ties broken by lower doc_id)."""
+        terms = [t for t in dict.fromkeys(query_terms) if t in self.postings]
+        if not terms or k <= 0 or not self.total_len:
+            return []
+        avgdl = self.total_len / len(self.doc_len)
+
+        # (upper bound, idf, ids, tfs) sorted by ascending upper bound
+        lists = []
+        for term in terms:
+            idf = self.idf(term)
+            ub = idf * self._tf_part(self.max_tf[term], self.min_dl[term], avgdl)
+            ids, tfs = self.postings[term]
+            lists.append((ub, idf, ids, tfs))
+        lists.sort(key=lambda x: x[0])
+        prefix = []
+        acc = 0.0
+        for ub, _, _, _ in lists:
+            acc += ub
+            prefix.append(acc)
+
+        n = len(lists)
+        pos = [0] * n
+        heap = []  # (score, -doc_id); heap[0] is the current k-th best
+        theta = 0.0
+        essential = 0  # lists[essential:] drive candidate generation
+
+        while essential < n:
+            cand = None
+            for i in range(essential, n):
+                ids = lists[i][2]
+                if pos[i] < len(ids) and (cand is None or ids[pos[i]] < cand):
+                    cand = ids[pos[i]]
+            if cand is None:
+                break
+
+            dl = self.doc_len[cand]
+            score = 0.0
+            for i in range(essential, n):
+                _, idf, ids, tfs = lists[i]
+                p = pos[i]
+                if p < len(ids) and ids[p] == cand:
+                    score += idf * self._tf_part(tfs[p], dl, avgdl)
+                    pos[i] = p + 1
+            # Non-essential lists, largest bound first; stop once the doc cannot make the heap
+            for i in range(essential - 1, -1, -1):
+                if score + prefix[i] <= theta:
+                    break
+                _, idf, ids, tfs = lists[i]
+                p = bisect_left(ids, cand, pos[i])
+                pos[i] = p
+                if p < len(ids) and ids[p] == cand:
+                    score += idf * self._tf_part(tfs[p], dl, avgdl)
+
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -cand))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, -cand))
+            if len(heap) == k:
+                theta = heap[0][0]
+                while essential < n and prefix[essential] <= theta:
+                    essential += 1
+
+        return [(score, -neg_id) for score, neg_id in sorted(heap, key=lambda x: (-x[0], -x[1]))]
+
+
+def document_texts(frame, columns=DOC_COLUMNS):
+    """Searchable text per row: the available `columns` joined with spaces."""
+    cols = [c for c in columns if c in frame]
+    if not cols:
+        return [""] * len(frame)
+    return frame[cols].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+
+
+def build_index(frame, columns=DOC_COLUMNS, k1=1.5, b=0.75):
+    """Build a BM25 index whose doc ids are the row positions of `frame`."""
+    index = BM25Index(k1=k1, b=b)
+    index.add_documents(document_texts(frame, columns))
+    return index
@@ -0,0 +1,97 @@
+"""
+Chart Summaries
+---------------
+Server-side aggregation for the dashboard charts. Every function reduces
+the filtered FIR frame to a small summary (counts, bins, quartiles), so
+the figures built from them carry a payload that depends on the number of
+categories/bins rather than on the number of rows.
+
+`app.py` memoizes these per filter state and only calls them for the
+tab or expander that is actually open; `reports.py` precomputes them per
+division and station for the report snapshots.
+"""
+
+import pandas as pd
+
+DATE_COL = 'Date_of_FIR_Filing'
+SOLVED_COL = 'Case_Solved'
+MAX_MAP_POINTS = 5000
+
+
+def add_derived_columns(frame):
+    """Parse dates and add the derived columns used by the charts (works on a full frame or just a tail)."""
+    frame[DATE_COL] = pd.to_datetime(frame[DATE_COL], errors='coerce')
+    frame['Total_Victims'] = frame['Victim_Count_Female'] + frame['Victim_Count_Male']
+    frame['Total_Convicts'] = frame['Convicted_Count_Male'] + frame['Convicted_Count_Female']
+    frame['Year'] = frame[DATE_COL].dt.year
+    frame['Month'] = frame[DATE_COL].dt.month
+    frame['Day_of_Week'] = frame[DATE_COL].dt.day_name()
+    return frame
+
+
+def monthly_counts(frame):
+    ts = frame.groupby(frame[DATE_COL].dt.to_period("M")).size().reset_index(name="Count")
+    ts[DATE_COL] = ts[DATE_COL].astype(str)
+    return ts
+
+
+def counts_by_solved(frame, by):
+    """Counts per `by` value, one column per solved status (for stacked bars)."""
+    return frame.groupby([by, SOLVED_COL]).size().unstack().fillna(0)
+
+
+def day_month_pivot(frame):
+    return frame.pivot_table(index='Day_of_Week', columns='Month', aggfunc='size', fill_value=0)
+
+
+def value_counts(frame, col, top=None):
+    counts = frame[col].value_counts()
+    return counts.nlargest(top) if top else counts
+
+
+def location_tree(frame, path):
+    return frame.groupby(list(path)).size().reset_index(name='Count')
+
+
+def sums_by(frame, by, cols):
+    return frame.groupby(by)[list(cols)].sum()
+
+
+def histogram_bins(frame, col, max_bins=50):
+    """Pre-binned histogram: exact counts per value for small integer ranges, equal-width bins otherwise."""
+    values = frame[col].dropna()
+    if values.empty:
+        return pd.DataFrame({col: [], "Count": []})
+    lo, hi = values.min(), values.max()
+    if pd.api.types.is_integer_dtype(values) and hi - lo < max_bins:
+        counts = values.value_counts().sort_index()
+        return pd.DataFrame({col: counts.index.astype(str), "Count": counts.values})
+    cats = pd.cut(values, bins=max_bins)
+    counts = cats.value_counts(sort=False)
+    return pd.DataFrame({col: [f"{iv.left:.1f}–{iv.right:.1f}" for iv in counts.index], "Count": counts.values})
+
+
+def box_stats(frame, by, col):
+    """Per-group quartiles and Tukey fences, enough to draw a box plot without the raw rows."""
+    rows = []
+    for key, values in frame.groupby(by)[col]:
+        values = values.dropna()
+        if values.empty:
+            continue
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        rows.append({by: key, "q1": q1, "median": median, "q3": q3,
+                     "lowerfence": inside.min(), "upperfence": inside.max(), "count": len(values)})
+    return pd.DataFrame(rows)
+
+
+def map_points(frame, lat_col, lon_col, color_col, max_points=MAX_MAP_POINTS):
+    """Map markers aggregated on a lat/lon grid (coarser until at most `max_points` cells)."""
+    pts = frame[[lat_col, lon_col, color_col]].dropna(subset=[lat_col, lon_col])
+    for decimals in (4, 3, 2, 1, 0):
+        grid = pts.assign(**{lat_col: pts[lat_col].round(decimals), lon_col: pts[lon_col].round(decimals)})
+        cells = grid.groupby([lat_col, lon_col, color_col]).size().reset_index(name="Count")
+        if len(cells) <= max_points:
+            return cells
+    return cells.nlargest(max_points, "Count")
@@ -0,0 +1,108 @@
+"""
+Filtered Result Export
+----------------------
+Writes a result frame to disk chunk by chunk, so the conversion itself
+never builds a full text copy of the result. Used by the dashboard's
+download button, which only generates the file when it is clicked.
+
+The download is not bounded in memory: Streamlit serves download data from
+memory, so `export_bytes` reads the finished file back in full. To keep that
+copy small, results above `LARGE_EXPORT_ROWS` are only offered in the
+compressed formats (see `export_formats`).
+
+Formats:
+  - "csv"     : plain CSV
+  - "csv.gz"  : gzip-compressed CSV
+  - "parquet" : columnar Parquet, one row group per chunk (requires pyarrow)
+"""
+
+import gzip
+import os
+import tempfile
+
+EXPORT_FORMATS = {
+    "csv.gz": ("Compressed CSV (.csv.gz)", "application/gzip"),
+    "csv": ("CSV (.csv)", "text/csv"),
+    "parquet": ("Parquet (.parquet, columnar)", "application/vnd.apache.parquet"),
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+LARGE_EXPORT_ROWS = 200_000  # above this, plain CSV is not offered
+COMPRESSED_FORMATS = ("csv.gz", "parquet")
+
+
+def export_formats(n_rows):
+    """Formats offered for a result of `n_rows` rows, default first."""
+    if n_rows > LARGE_EXPORT_ROWS:
+        return list(COMPRESSED_FORMATS)
+    return list(EXPORT_FORMATS)
+
+
+def iter_chunks(frame, chunksize=DEFAULT_CHUNKSIZE):
+    for start in range(0, len(frame), chunksize):
+        yield frame.iloc[start:start + chunksize]
+
+
+def export_csv(frame, path, compress=False, chunksize=DEFAULT_CHUNKSIZE):
+    """Write `frame` as (optionally gzip-compressed) CSV, one chunk at a time."""
+    opener = gzip.open if compress else open
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        # header is written even for an empty frame
+        frame.iloc[0:0].to_csv(f, index=False)
+        for chunk in iter_chunks(frame, chunksize):
+            chunk.to_csv(f, index=False, header=False)
+    return path
+
+
+def export_parquet(frame, path, chunksize=DEFAULT_CHUNKSIZE):
+    """Write `frame` as Parquet with one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow).") from e
+
+    writer = None
+    try:
+        for chunk in iter_chunks(frame, chunksize):
+            # later chunks are cast to the schema inferred from the first one
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="snappy")
+            writer.write_table(table)
+        if writer is None:
+            # empty result: write the schema only
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def export_frame(frame, fmt="csv.gz", path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Export `frame` in format `fmt` to `path` (a new temp file if omitted) and return the path."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="filtered_fir_", suffix="." + fmt)
+        os.close(fd)
+    try:
+        if fmt == "parquet":
+            return export_parquet(frame, path, chunksize)
+        return export_csv(frame, path, compress=(fmt == "csv.gz"), chunksize=chunksize)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def export_bytes(frame, fmt="csv.gz", chunksize=DEFAULT_CHUNKSIZE):
+    """Contents of `frame` exported in format `fmt`, held in memory in full; the temp file used for the
+    chunked write is always removed.
+    """
+    path = export_frame(frame, fmt, chunksize=chunksize)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
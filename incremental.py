@@ -0,0 +1,108 @@
+"""
+Incremental Tail Refresh
+------------------------
+Helpers used by `app.py` to pick up FIRs appended to the input CSV
+(e.g. by `register_fir_app.py`) without re-reading the whole dataset.
+
+The last search run from the dashboard is remembered in a small JSON
+sidecar next to the filtered CSV, together with the byte offset of the
+input CSV that search covered. On refresh only the bytes after that
+offset are parsed, matched against the same search and appended.
+"""
+
+import io
+import json
+import os
+
+import pandas as pd
+
+from KMP import extract_keywords, matches_any
+from Formatting import normalize_text, search_text
+
+
+def state_path(output_csv):
+    return output_csv + ".state.json"
+
+
+def save_search_state(output_csv, kind, query, offset, **extra):
+    """Remember the active search (`kind` is 'pattern', 'description' or 'ranked') and the input offset it covers.
+    Extra search options (e.g. `top_k`) are stored alongside.
+    """
+    state = {"kind": kind, "query": query, "offset": int(offset)}
+    state.update(extra)
+    with open(state_path(output_csv), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    return state
+
+
+def load_search_state(output_csv):
+    """Return the saved search state dict, or None if no search was recorded."""
+    try:
+        with open(state_path(output_csv), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def search_patterns(kind, query):
+    """Normalized KMP patterns for a saved search. Raises ValueError if none are left after normalization."""
+    if kind == "description":
+        patterns = extract_keywords(query)
+    else:
+        patterns = [p for p in [normalize_text(query)] if p]
+    if not patterns:
+        # an empty pattern would match every row
+        raise ValueError("Search pattern is empty after normalization (only stopwords/punctuation).")
+    return patterns
+
+
+def read_header(input_csv):
+    """The raw header line of a CSV (used to detect rewrites that change the columns)."""
+    with open(input_csv, "rb") as f:
+        return f.readline().decode("utf-8")
+
+
+def read_tail_frame(input_csv, offset, header=None):
+    """Parse only the complete rows appended to `input_csv` after byte `offset`.
+
+    Returns (frame, new_offset). `frame` is None when the file was rewritten
+    rather than appended to (it shrank, or its header no longer equals
+    `header`), and a full reload is required. A trailing partial line
+    (a write still in progress) is left for next time.
+    """
+    size = os.path.getsize(input_csv)
+    if size < offset:
+        return None, 0
+    with open(input_csv, "rb") as f:
+        header_line = f.readline()
+        if header is not None and header_line.decode("utf-8") != header:
+            return None, 0
+        offset = max(offset, len(header_line))
+        f.seek(offset)
+        data = f.read(size - offset)
+
+    end = data.rfind(b"\n")
+    if end < 0:
+        return pd.DataFrame(), offset
+    chunk = data[:end + 1]
+    frame = pd.read_csv(io.BytesIO(header_line + chunk), encoding="utf-8")
+    return frame, offset + len(chunk)
+
+
+def filter_mask(frame, patterns):
+    """Boolean mask of rows whose normalized search text contains any of the (normalized) patterns."""
+    return search_text(frame).map(lambda s: matches_any(patterns, s)).astype(bool)
+
+
+def filter_frame(frame, patterns):
+    """Rows of `frame` whose normalized search text contains any of the (normalized) patterns."""
+    if frame.empty:
+        return frame
+    return frame[filter_mask(frame, patterns)]
+
+
+def append_rows(output_csv, frame):
+    """Append `frame` to an existing CSV, aligned to that file's header."""
+    with open(output_csv, "r", encoding="utf-8") as f:
+        columns = pd.read_csv(f, nrows=0).columns
+    frame.reindex(columns=columns).to_csv(output_csv, mode="a", header=False, index=False, encoding="utf-8")
@@ -10,18 +10,27 @@ Run with:
 
 This script:
  - Presents a form with fields matching `synthetic_fir1.csv` columns.
- - Builds a `Formatted` value using the parser in `Formatting.py`.
- - Appends the new FIR to `synthetic_fir1.csv` safely.
+ - Builds a `Formatted` value using the parser in `Formatting.py`,
+   plus its normalized `Search_Text` used by the search paths (stored
+   only if the dataset already has that column; see `Formatting.py`).
+ - Appends the new FIR to `synthetic_fir1.csv` under its existing header.
+ - Checks the new FIR against the standing watch-list queries
+   (`watchlist.py`) and logs any matches as alerts.
 """
 
 import streamlit as st
 import pandas as pd
 import os
+import csv
 from datetime import date, datetime
 import uuid
 
 # Import the parser from Formatting.py (uses local parse_fir_description)
-from Formatting import parse_fir_description
+from Formatting import parse_fir_description, normalize_text, SEARCH_COLUMN
+# Incremental term counts for the dashboard word cloud
+from term_index import record_registration, default_db_path
+# Standing watch-list queries evaluated on each new FIR
+from watchlist import Watchlist, append_alerts, default_watchlist_path, default_alert_log_path
 # Import hierarchical data from generate_data.py
 from generate_data import POLICE_STRUCTURE, CRIMINAL_ACTS, OFFICERS
 
@@ -51,6 +60,38 @@ def get_all_modus_operandi():
         modi.extend(act_modi)
     return sorted(list(set(modi)))
 
+@st.cache_resource(max_entries=1)
+def compiled_watchlist(path, mtime):
+    """Watch-list compiled once per version of the saved-queries file (keyed by its mtime)."""
+    return Watchlist.from_file(path)
+
+def check_watchlist(row):
+    """Evaluate a new FIR against all standing queries and log matches -> [(query, keywords), ...]."""
+    watch_path = default_watchlist_path(CSV_PATH)
+    if not os.path.exists(watch_path):
+        return []
+    matches = compiled_watchlist(watch_path, os.path.getmtime(watch_path)).match(row)
+    append_alerts(default_alert_log_path(CSV_PATH), row, matches)
+    return matches
+
+def csv_header(path):
+    """Column names of an existing, non-empty CSV (None if there is none yet)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def append_row(path, row, fieldnames):
+    """Append one record to the CSV in place (no full read/rewrite of the dataset), in the file's column order."""
+    with open(path, "rb") as f:
+        # Make sure the previous last row is newline-terminated
+        f.seek(-1, os.SEEK_END)
+        needs_newline = f.read(1) != b"\n"
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        if needs_newline:
+            f.write("\n")
+        csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n", extrasaction="ignore").writerow(row)
+
 # Expected columns/order in synthetic_fir1.csv
 CSV_COLUMNS = [
     "FIR_ID","Police_Division","Police_Station","Date_of_FIR_Filing",
@@ -238,26 +279,53 @@ if submit:
             "Modus_Operandi": modus_operandi,
             "FIR_Description": fir_description,
             "Formatted": formatted_text,
+            # Normalized once at ingest; search paths match this column directly
+            SEARCH_COLUMN: normalize_text(formatted_text),
         }
 
         # Append safely to CSV
         try:
-            if os.path.exists(CSV_PATH):
+            header = csv_header(CSV_PATH)
+            if header is not None and set(CSV_COLUMNS) <= set(header):
+                # Append just the new row, under the file's own header, so readers tailing the file (app.py)
+                # only parse this row. Search_Text is written only if the file already has that column;
+                # older datasets are migrated with `python3 Formatting.py <csv>`, never from this form.
+                pre_offset = os.path.getsize(CSV_PATH)
+                append_row(CSV_PATH, new_row, header)
+                try:
+                    # Keep the word-cloud term counts current; if this fails the dashboard catches up from the tail
+                    record_registration(default_db_path(CSV_PATH), new_row, CSV_PATH, pre_offset)
+                except Exception:
+                    pass
+            elif header is not None:
                 df = pd.read_csv(CSV_PATH, dtype=str)
                 # Ensure columns exist; if not, reindex to expected columns
                 for c in CSV_COLUMNS:
                     if c not in df.columns:
                         df[c] = ""
-                df = df[CSV_COLUMNS]
+                df = df[CSV_COLUMNS + ([SEARCH_COLUMN] if SEARCH_COLUMN in df.columns else [])]
                 # Append
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True, sort=False)
-                df.to_csv(CSV_PATH, index=False, encoding='utf-8')
+                df = pd.concat([df, pd.DataFrame([new_row])[df.columns]], ignore_index=True, sort=False)
+                # Write a temp file and swap it in, so readers never see a half-written dataset
+                df.to_csv(CSV_PATH + ".tmp", index=False, encoding='utf-8')
+                os.replace(CSV_PATH + ".tmp", CSV_PATH)
             else:
                 # Create new DataFrame with proper columns
-                df = pd.DataFrame([new_row], columns=CSV_COLUMNS)
+                df = pd.DataFrame([new_row], columns=CSV_COLUMNS + [SEARCH_COLUMN])
                 df.to_csv(CSV_PATH, index=False, encoding='utf-8')
 
             st.success(f"✅ FIR successfully registered!")
+
+            try:
+                watch_matches = check_watchlist(new_row)
+            except Exception as e:
+                # the FIR is saved; make sure a broken watch-list or alert log does not go unnoticed
+                st.error(f"Watch-list check failed, no alerts were recorded for this FIR: {e}")
+                watch_matches = []
+            if watch_matches:
+                names = [q.get("name", "") for q, _ in watch_matches]
+                more = f" and {len(names) - 10} more" if len(names) > 10 else ""
+                st.warning("🔔 Matches watch-list: " + ", ".join(names[:10]) + more)
             
             # Show success details in columns
             dc1, dc2 = st.columns(2)
@@ -0,0 +1,257 @@
+"""
+Report Snapshots
+----------------
+Offline builder for the per-division and per-station views commanders
+open every morning. Each scope (the whole city, every division and every
+station in `POLICE_STRUCTURE`) gets its KPIs and chart summaries computed
+once, in a process pool, and written as static files:
+  - `<scope>.json` — KPIs and chart data, served by the dashboard
+  - `<scope>.html` — a standalone page with the same KPIs, each chart
+    rendered to an embedded PNG (matplotlib, in the worker) above its table
+
+`manifest.json` records the CSV byte offset the snapshots cover. A rerun
+parses only the rows appended since then and rebuilds just the scopes
+(city, division, station) those rows belong to; a rewritten CSV or a
+changed `POLICE_STRUCTURE` rebuilds everything.
+
+Build or refresh the snapshots from the command line (e.g. from cron):
+    python3 reports.py synthetic_fir1.csv
+"""
+
+import base64
+import html
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import chart_data
+from generate_data import POLICE_STRUCTURE
+from incremental import read_header, read_tail_frame
+
+DIVISION_COL = "Police_Division"
+STATION_COL = "Police_Station"
+ALL_SCOPE = ()  # scopes are () for the city, (division,) or (division, station)
+
+# chart name -> (chart_data function, args); "by_area" breaks down by the next level of the scope
+SNAPSHOT_CHARTS = {
+    "monthly": ("monthly_counts", ()),
+    "by_year": ("counts_by_solved", ("Year",)),
+    "acts": ("value_counts", ("Criminal_Act",)),
+    "activities": ("value_counts", ("Criminal_Activity", 15)),
+    "solved": ("value_counts", ("Case_Solved",)),
+    "officers": ("counts_by_solved", ("Investigating_Officer",)),
+    "victims": ("histogram_bins", ("Total_Victims",)),
+    "day_month": ("day_month_pivot", ()),
+}
+AREA_COLUMNS = (DIVISION_COL, STATION_COL, "Locality")  # breakdown column per scope depth
+# chart name -> (kind, title) of its image in the HTML page
+CHART_STYLES = {
+    "monthly": ("line", "Monthly FIR Trend"),
+    "by_area": ("stacked", "FIRs by Area (Stacked by Solved Status)"),
+    "by_year": ("stacked", "FIRs by Year (Stacked by Solved Status)"),
+    "acts": ("barh", "FIRs by Criminal Act"),
+    "activities": ("barh", "FIRs by Criminal Activity"),
+    "solved": ("pie", "Case Solved Status"),
+    "victims": ("bar", "Distribution of Total Victims"),
+    "officers": ("stacked", "Cases per Officer (Solved vs Unsolved)"),
+    "day_month": ("heatmap", "FIRs by Day of Week and Month"),
+}
+
+
+def default_report_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + "_reports"
+
+
+def all_scopes(structure=POLICE_STRUCTURE):
+    scopes = [ALL_SCOPE]
+    for division, stations in structure.items():
+        scopes.append((division,))
+        scopes.extend((division, station) for station in stations)
+    return scopes
+
+
+def scope_title(scope):
+    return " / ".join(scope) if scope else "All divisions"
+
+
+def scope_slug(scope):
+    return re.sub(r"[^a-z0-9]+", "-", scope_title(scope).lower()).strip("-")
+
+
+def _table(frame):
+    """JSON-safe "split" form of a summary Series/DataFrame."""
+    if isinstance(frame, pd.Series):
+        frame = frame.to_frame()
+    return json.loads(frame.to_json(orient="split", date_format="iso"))
+
+
+def _frame(table):
+    return pd.DataFrame(table["data"], index=table["index"], columns=table["columns"])
+
+
+def compute_snapshot(scope, frame):
+    """KPIs and chart summaries of one scope's rows, as a JSON-serializable dict."""
+    solved = frame["Case_Solved"].value_counts(normalize=True).get("Yes", 0) if len(frame) else 0
+    acts = frame["Criminal_Act"].dropna()
+    kpis = {
+        "total_firs": int(len(frame)),
+        "top_crime": str(acts.mode()[0]) if not acts.empty else "N/A",
+        "stations": int(frame[STATION_COL].nunique()),
+        "solved_pct": round(float(solved) * 100, 1),
+        "total_victims": int(frame["Total_Victims"].sum()),
+    }
+    charts = {}
+    if len(frame):
+        for name, (func, args) in SNAPSHOT_CHARTS.items():
+            charts[name] = _table(getattr(chart_data, func)(frame, *args))
+        charts["by_area"] = _table(chart_data.counts_by_solved(frame, AREA_COLUMNS[len(scope)]))
+    return {"scope": list(scope), "title": scope_title(scope), "kpis": kpis, "charts": charts}
+
+
+def render_chart_png(name, frame):
+    """One snapshot chart as PNG bytes. Uses a bare matplotlib Figure (no pyplot state), imported
+    here so the dashboard, which imports this module, doesn't pay for matplotlib at startup.
+    """
+    from matplotlib.figure import Figure
+
+    kind, title = CHART_STYLES.get(name, ("bar", name))
+    fig = Figure(figsize=(8, 4.5), layout="constrained")
+    ax = fig.add_subplot()
+    if kind == "line":
+        ax.plot(pd.to_datetime(frame.iloc[:, 0]), frame.iloc[:, 1], marker=".")
+    elif kind == "stacked":
+        bottom = None
+        for col in frame.columns:
+            ax.bar(frame.index.astype(str), frame[col], bottom=bottom, label=str(col))
+            bottom = frame[col] if bottom is None else bottom + frame[col]
+        ax.legend(title="Solved")
+        ax.tick_params(axis="x", labelrotation=60)
+    elif kind == "barh":
+        ax.barh(frame.index.astype(str)[::-1], frame.iloc[::-1, 0])
+    elif kind == "pie":
+        ax.pie(frame.iloc[:, 0], labels=frame.index.astype(str), autopct="%1.1f%%")
+    elif kind == "heatmap":
+        image = ax.imshow(frame.to_numpy(dtype=float), aspect="auto", cmap="Blues")
+        ax.set_xticks(range(len(frame.columns)), frame.columns.astype(str))
+        ax.set_yticks(range(len(frame.index)), frame.index.astype(str))
+        fig.colorbar(image, ax=ax)
+    else:
+        ax.bar(frame.iloc[:, 0].astype(str), frame.iloc[:, 1])
+    ax.set_title(title)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=80)
+    return buf.getvalue()
+
+
+def render_html(snapshot):
+    title = html.escape(snapshot["title"])
+    parts = [f"<html><head><meta charset='utf-8'><title>{title}</title></head><body>",
+             f"<h1>FIR report: {title}</h1>", f"<p>Built {html.escape(snapshot['built_at'])}</p>", "<ul>"]
+    parts += [f"<li>{html.escape(k)}: {html.escape(str(v))}</li>" for k, v in snapshot["kpis"].items()]
+    parts.append("</ul>")
+    for name, table in snapshot["charts"].items():
+        frame = _frame(table)
+        png = base64.b64encode(render_chart_png(name, frame)).decode("ascii")
+        parts.append(f"<h2>{html.escape(CHART_STYLES.get(name, (None, name))[1])}</h2>")
+        parts.append(f"<img src='data:image/png;base64,{png}' alt='{html.escape(name)}'>")
+        parts.append(frame.to_html(border=0))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def write_snapshot(scope, frame, out_dir, offset):
+    """Compute and write one scope's JSON and HTML snapshot (runs in a worker process)."""
+    snapshot = compute_snapshot(scope, frame)
+    snapshot.update(built_at=datetime.now().isoformat(timespec="seconds"), offset=offset)
+    slug = scope_slug(scope)
+    for ext, text in ((".json", json.dumps(snapshot)), (".html", render_html(snapshot))):
+        path = os.path.join(out_dir, slug + ext)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+    return scope, slug, snapshot["kpis"]["total_firs"]
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, "manifest.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def load_snapshot(out_dir, scope):
+    """A scope's snapshot with its chart tables as DataFrames, or None if it has not been built."""
+    try:
+        with open(os.path.join(out_dir, scope_slug(scope) + ".json"), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    snapshot["charts"] = {name: _frame(table) for name, table in snapshot["charts"].items()}
+    return snapshot
+
+
+def touched_scopes(tail, scopes):
+    """Scopes whose rows include any of the `tail` rows."""
+    pairs = set(zip(tail[DIVISION_COL], tail[STATION_COL]))
+    divisions = {d for d, _ in pairs}
+    return [s for s in scopes if not s or (len(s) == 1 and s[0] in divisions) or s in pairs]
+
+
+def build_reports(csv_path, out_dir=None, workers=None, force=False):
+    """Rebuild the snapshots that are out of date with `csv_path` -> list of rebuilt scopes."""
+    out_dir = out_dir or default_report_dir(csv_path)
+    os.makedirs(out_dir, exist_ok=True)
+    scopes = all_scopes()
+    manifest = load_manifest(out_dir)
+
+    dirty = scopes
+    if not force and manifest and manifest.get("scopes") == [scope_slug(s) for s in scopes]:
+        tail, _ = read_tail_frame(csv_path, manifest["offset"], manifest.get("header"))
+        if tail is not None:
+            dirty = touched_scopes(tail, scopes) if not tail.empty else []
+    if not dirty:
+        return []
+
+    # Everything up to the last complete line, so the snapshots and the recorded offset agree
+    header = read_header(csv_path)
+    frame, offset = read_tail_frame(csv_path, 0)
+    frame = chart_data.add_derived_columns(frame)
+    by_division = dict(tuple(frame.groupby(DIVISION_COL)))
+    by_station = dict(tuple(frame.groupby([DIVISION_COL, STATION_COL])))
+    empty = frame.iloc[:0]
+
+    def rows(scope):
+        if not scope:
+            return frame
+        if len(scope) == 1:
+            return by_division.get(scope[0], empty)
+        return by_station.get(scope, empty)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write_snapshot, scope, rows(scope), out_dir, offset) for scope in dirty]
+        built = [f.result()[0] for f in futures]
+
+    save_manifest(out_dir, {"offset": offset, "header": header, "built_at": datetime.now().isoformat(timespec="seconds"),
+                            "scopes": [scope_slug(s) for s in scopes]})
+    return built
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "synthetic_fir1.csv"
+    force = "--force" in sys.argv[2:]
+    built = build_reports(csv_path, force=force)
+    print(f"✅ Rebuilt {len(built)} report snapshot(s) in {default_report_dir(csv_path)}")
@@ -0,0 +1,101 @@
+"""
+Startup Timing & Deferred Imports
+---------------------------------
+Helpers that keep the dashboard's time to first paint low:
+  - `LazyModule` defers importing a heavy library (plotly, matplotlib,
+    seaborn, wordcloud) until the first attribute access, i.e. until a
+    chart that needs it is actually rendered.
+  - `IMPORT_TIMES` records how long each deferred import took, and
+    `StartupTimer` marks phases of a script run against a time budget.
+
+Check cold import times against the startup budget from the command line:
+    python3 startup.py
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+# Seconds allowed for the eager part of a cold start (override with FIR_STARTUP_BUDGET)
+STARTUP_BUDGET_SECONDS = float(os.environ.get("FIR_STARTUP_BUDGET", "2.0"))
+
+# Imported before the first paint
+EAGER_MODULES = ("streamlit", "pandas", "numpy")
+# Deferred until a chart needs them
+HEAVY_MODULES = ("plotly.express", "plotly.graph_objects", "matplotlib.pyplot", "seaborn", "wordcloud")
+
+IMPORT_TIMES = {}  # module name -> seconds spent importing it (process-wide, first import only)
+
+
+def timed_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "deferred"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class StartupTimer:
+    """Elapsed-time marks for one script run, checked against a budget."""
+
+    def __init__(self, budget=STARTUP_BUDGET_SECONDS):
+        self.budget = budget
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        elapsed = time.perf_counter() - self.start
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    def elapsed(self, label):
+        return next((t for name, t in self.marks if name == label), None)
+
+    def over_budget(self, label):
+        elapsed = self.elapsed(label)
+        return elapsed is not None and elapsed > self.budget
+
+
+def measure_cold_imports(modules=EAGER_MODULES + HEAVY_MODULES):
+    """Import time of each module in a fresh interpreter -> {name: seconds or None if not installed}."""
+    times = {}
+    for name in modules:
+        code = f"import time; t = time.perf_counter(); import {name}; print(time.perf_counter() - t)"
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        times[name] = float(proc.stdout.strip()) if proc.returncode == 0 else None
+    return times
+
+
+if __name__ == "__main__":
+    times = measure_cold_imports()
+    eager_total = 0.0
+    for name, seconds in times.items():
+        kind = "eager" if name in EAGER_MODULES else "deferred"
+        if seconds is None:
+            print(f"{name:24s} {kind:9s} not installed")
+            continue
+        if kind == "eager":
+            eager_total += seconds
+        print(f"{name:24s} {kind:9s} {seconds:6.3f}s")
+    print(f"Eager imports: {eager_total:.3f}s (budget {STARTUP_BUDGET_SECONDS:.3f}s)")
+    sys.exit(0 if eager_total <= STARTUP_BUDGET_SECONDS else 1)
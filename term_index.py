@@ -0,0 +1,191 @@
+"""
+Term-Frequency Store
+--------------------
+SQLite table of term counts per (division, station, act, year-month),
+used for the keyword word cloud and "top terms" table in `app.py`.
+
+Counts are maintained incrementally: `register_fir_app.py` adds each new
+FIR's terms when it is registered, and `sync_term_store` indexes only rows
+appended to the CSV since the last sync (or rebuilds if the CSV was
+rewritten). Roll-ups are GROUP BY queries over the stored counts, so their
+cost depends on the number of groups and the vocabulary, not on rows.
+
+Build or refresh the store from the command line:
+    python3 term_index.py synthetic_fir1.csv
+"""
+
+import os
+import sqlite3
+import sys
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+from Formatting import tokenize
+from bitmap_index import year_month
+from incremental import read_header, read_tail_frame
+
+TEXT_COLUMN = "FIR_Description"
+GROUP_COLUMNS = ("Police_Division", "Police_Station", "Criminal_Act")
+STORE_COLUMNS = ("division", "station", "act", "year_month")
+# Boilerplate from the description template ("..., 3 victims") that would dominate every cloud
+TERM_STOPWORDS = frozenset({"victim", "victims"})
+
+
+def default_db_path(csv_path):
+    """Term store lives next to the dataset: synthetic_fir1.csv -> synthetic_fir1_terms.db"""
+    return os.path.splitext(csv_path)[0] + "_terms.db"
+
+
+def term_tokens(text):
+    """Word-cloud terms of a description: normalized tokens, length >= 3, no pure numbers (dates, counts) or boilerplate."""
+    if not isinstance(text, str):
+        return []
+    return [t for t in tokenize(text) if len(t) >= 3 and not t.isdigit() and t not in TERM_STOPWORDS]
+
+
+def connect(db_path):
+    # autocommit mode; writers use explicit BEGIN IMMEDIATE so reading the offset and updating counts is atomic
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("""CREATE TABLE IF NOT EXISTS term_counts (
+        division TEXT,
+        station TEXT,
+        act TEXT,
+        year_month TEXT,
+        term TEXT,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (division, station, act, year_month, term)
+    ) WITHOUT ROWID""")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+@contextmanager
+def _write_txn(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                 (key, str(value)))
+
+
+def count_frame(frame):
+    """Counter of (division, station, act, year_month, term) -> occurrences for the rows of `frame`."""
+    counts = Counter()
+    if frame.empty or TEXT_COLUMN not in frame:
+        return counts
+    keys = frame.reindex(columns=list(GROUP_COLUMNS)).fillna("").astype(str)
+    if "Date_of_FIR_Filing" in frame:
+        months = year_month(pd.to_datetime(frame["Date_of_FIR_Filing"], errors="coerce")).fillna("")
+    else:
+        months = [""] * len(frame)
+    for div, stn, act, ym, text in zip(keys[GROUP_COLUMNS[0]], keys[GROUP_COLUMNS[1]], keys[GROUP_COLUMNS[2]],
+                                       months, frame[TEXT_COLUMN]):
+        for term in term_tokens(text):
+            counts[(div, stn, act, ym, term)] += 1
+    return counts
+
+
+def add_counts(conn, counts):
+    conn.executemany(
+        """INSERT INTO term_counts (division, station, act, year_month, term, count) VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(division, station, act, year_month, term) DO UPDATE SET count = count + excluded.count""",
+        [key + (n,) for key, n in counts.items()],
+    )
+
+
+def record_registration(db_path, row, csv_path, pre_offset):
+    """Add one newly registered FIR's terms, right after it was appended to `csv_path`.
+
+    The store's CSV offset is advanced only if it was in sync (== `pre_offset`, the CSV size
+    before the append); otherwise the row is left for `sync_term_store` to pick up from the tail.
+    """
+    conn = connect(db_path)
+    try:
+        with _write_txn(conn):
+            if int(_get_meta(conn, "offset", -1)) != pre_offset:
+                return False
+            add_counts(conn, count_frame(pd.DataFrame([row])))
+            _set_meta(conn, "offset", os.path.getsize(csv_path))
+        return True
+    finally:
+        conn.close()
+
+
+def rebuild_term_store(csv_path, db_path, chunksize=100_000):
+    """Recount every row of `csv_path`, one chunk at a time."""
+    offset = os.path.getsize(csv_path)
+    header = read_header(csv_path)
+    conn = connect(db_path)
+    try:
+        with _write_txn(conn):
+            conn.execute("DELETE FROM term_counts")
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                add_counts(conn, count_frame(chunk))
+            _set_meta(conn, "offset", offset)
+            _set_meta(conn, "header", header)
+    finally:
+        conn.close()
+    return offset
+
+
+def sync_term_store(csv_path, db_path=None):
+    """Bring the store up to date with `csv_path` and return the CSV offset it now covers."""
+    db_path = db_path or default_db_path(csv_path)
+    conn = connect(db_path)
+    try:
+        offset = int(_get_meta(conn, "offset", -1))
+        if offset >= 0 and offset == os.path.getsize(csv_path):
+            return offset
+        with _write_txn(conn):
+            # re-read under the write lock: a registration may have advanced the offset meanwhile
+            offset = int(_get_meta(conn, "offset", -1))
+            tail = None
+            if offset >= 0:
+                tail, new_offset = read_tail_frame(csv_path, offset, _get_meta(conn, "header"))
+            if tail is not None:
+                add_counts(conn, count_frame(tail))
+                _set_meta(conn, "offset", new_offset)
+                return new_offset
+    finally:
+        conn.close()
+    return rebuild_term_store(csv_path, db_path)
+
+
+def top_terms(db_path, limit=100, divisions=None, stations=None, acts=None, year_months=None):
+    """Roll up counts over the selected groups (empty/None = no restriction) -> [(term, count), ...]."""
+    clauses, params = [], []
+    for column, values in zip(STORE_COLUMNS, (divisions, stations, acts, year_months)):
+        if values:
+            values = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = connect(db_path)
+    try:
+        return conn.execute(
+            f"SELECT term, SUM(count) AS n FROM term_counts {where} GROUP BY term ORDER BY n DESC, term LIMIT ?",
+            params + [int(limit)],
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "synthetic_fir1.csv"
+    db_path = default_db_path(csv_path)
+    sync_term_store(csv_path, db_path)
+    print(f"✅ Term store {db_path} is up to date with {csv_path}")
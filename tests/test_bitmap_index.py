@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap_index import BitmapIndex, RoaringBitmap, YEAR_MONTH, union_all, year_month
+
+
+def random_ids(rng, n, high):
+    return np.unique(rng.integers(0, high, n))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_container_ops_match_sets(seed):
+    rng = np.random.default_rng(seed)
+    high = 3 << 16  # three chunks
+    # sparse (array) and dense (bitmap) containers, in every pairing
+    for n_a, n_b in [(100, 200), (100, 60000), (60000, 100), (60000, 90000)]:
+        a, b = random_ids(rng, n_a, high), random_ids(rng, n_b, high)
+        bm_a, bm_b = RoaringBitmap.from_sorted(a), RoaringBitmap.from_sorted(b)
+        assert bm_a.to_array().tolist() == a.tolist()
+        assert (bm_a & bm_b).to_array().tolist() == sorted(set(a) & set(b))
+        assert (bm_a | bm_b).to_array().tolist() == sorted(set(a) | set(b))
+        assert len(bm_a & bm_b) == len(set(a) & set(b))
+
+
+def test_union_all_and_from_mask():
+    mask = np.zeros(200000, dtype=bool)
+    mask[[0, 5, 65535, 65536, 199999]] = True
+    assert RoaringBitmap.from_mask(mask).to_array().tolist() == [0, 5, 65535, 65536, 199999]
+    parts = [RoaringBitmap.from_sorted([1, 2]), RoaringBitmap.from_sorted([2, 70000])]
+    assert union_all(parts).to_array().tolist() == [1, 2, 70000]
+
+
+def random_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.to_datetime("2023-01-01") + pd.to_timedelta(rng.integers(0, 700, n), unit="D"))
+    dates[rng.random(n) < 0.02] = pd.NaT
+    return pd.DataFrame({
+        "Police_Division": rng.choice(["North", "South", "East"], n),
+        "Police_Station": rng.choice([f"S{i}" for i in range(8)], n),
+        "Criminal_Act": rng.choice(["Theft", "Fraud", None], n),
+        "Case_Solved": rng.choice(["Yes", "No"], n),
+        "Investigating_Officer": rng.choice(["A", "B", "C", "D"], n),
+        "Date_of_FIR_Filing": dates,
+    })
+
+
+def pandas_select(frame, selections, date_range):
+    mask = pd.Series(True, index=frame.index)
+    for col, values in selections.items():
+        if values:
+            source = year_month(frame["Date_of_FIR_Filing"]) if col == YEAR_MONTH else frame[col]
+            mask &= source.isin(values)
+    if date_range:
+        dates = frame["Date_of_FIR_Filing"]
+        mask &= (dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))
+    return np.flatnonzero(mask.to_numpy())
+
+
+SELECTIONS = [
+    ({}, None),
+    ({"Police_Division": ["North"]}, None),
+    ({"Police_Division": ["North", "South", "East"]}, None),
+    ({"Police_Station": ["S1", "S3"], "Case_Solved": ["Yes"]}, None),
+    ({"Criminal_Act": ["Theft", "Fraud"]}, None),  # all non-null values of a column with nulls
+    ({YEAR_MONTH: ["2023-03", "2024-01"]}, None),
+    ({"Investigating_Officer": ["A"]}, ("2023-06-01", "2023-12-31")),
+    ({}, ("2022-01-01", "2026-01-01")),  # covers every date, but some rows have none
+]
+
+
+@pytest.mark.parametrize("selections,date_range", SELECTIONS)
+def test_select_matches_pandas(selections, date_range):
+    frame = random_frame(5000, 1)
+    index = BitmapIndex.from_frame(frame)
+    selected = index.select(selections, date_range)
+    got = np.arange(len(frame)) if selected is None else selected.to_array()
+    assert got.tolist() == pandas_select(frame, selections, date_range).tolist()
+
+
+def test_full_date_range_is_unrestricted():
+    frame = random_frame(1000, 2).dropna(subset=["Date_of_FIR_Filing"]).reset_index(drop=True)
+    index = BitmapIndex.from_frame(frame)
+    first, last = pd.Timestamp(index.sorted_dates[0]), pd.Timestamp(index.sorted_dates[-1])
+    assert index.date_between(first, last) is None
+    assert len(index.date_between(first + pd.Timedelta(days=1), last)) < len(frame)
+
+
+def test_extended_is_copy_on_write():
+    frame = random_frame(3000, 3)
+    head, tail = frame.iloc[:2000], frame.iloc[2000:].reset_index(drop=True)
+    base = BitmapIndex.from_frame(head)
+    before = base.select({"Police_Division": ["North"]}, ("2023-03-01", "2024-03-01")).to_array().tolist()
+
+    extended = base.extended(tail)
+    full = BitmapIndex.from_frame(frame)
+    for selections, date_range in SELECTIONS:
+        got, want = extended.select(selections, date_range), full.select(selections, date_range)
+        assert (got is None) == (want is None)
+        if got is not None:
+            assert got.to_array().tolist() == want.to_array().tolist()
+
+    # the original index still describes only its own rows
+    assert base.n_rows == 2000
+    assert base.select({"Police_Division": ["North"]}, ("2023-03-01", "2024-03-01")).to_array().tolist() == before
+
+
+def test_year_month_matches_strftime():
+    dates = random_frame(2000, 4)["Date_of_FIR_Filing"]
+    got, want = year_month(dates), dates.dt.strftime("%Y-%m")
+    assert got.isna().tolist() == want.isna().tolist()
+    assert got[got.notna()].tolist() == want[want.notna()].tolist()
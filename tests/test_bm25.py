@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from bm25 import BM25Index, normalized_tokens, tokenize
+
+VOCAB = ["robbery", "snatching", "knife", "chain", "market", "camp", "night", "vehicle", "theft", "atm",
+         "gang", "stalking", "online", "fraud", "bike"]
+
+
+def random_docs(n, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(VOCAB, k=rng.randint(1, 12))) for _ in range(n)]
+
+
+def brute_scores(index, query_terms):
+    """Score every document with the plain BM25 formula."""
+    terms = [t for t in dict.fromkeys(query_terms) if t in index.postings]
+    avgdl = index.total_len / len(index.doc_len)
+    scores = {}
+    for term in terms:
+        idf = index.idf(term)
+        for doc_id, tf in zip(*index.postings[term]):
+            dl = index.doc_len[doc_id]
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (index.k1 + 1) / (
+                tf + index.k1 * (1 - index.b + index.b * dl / avgdl))
+    return scores
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [1, 5, 50, 1000])
+def test_top_k_matches_brute_force(seed, k):
+    index = BM25Index()
+    index.add_documents(random_docs(500, seed))
+    query = random.Random(seed + 100).sample(VOCAB, 3)
+
+    hits = index.top_k(query, k)
+    scores = brute_scores(index, query)
+    expected = sorted(scores.values(), reverse=True)[:k]
+
+    assert [s for s, _ in hits] == pytest.approx(expected)
+    for score, doc_id in hits:
+        assert scores[doc_id] == pytest.approx(score)
+    assert len({doc_id for _, doc_id in hits}) == len(hits)
+
+
+def test_incremental_add_matches_full_build():
+    docs = random_docs(300, 7)
+    full = BM25Index()
+    full.add_documents(docs)
+    incremental = BM25Index()
+    incremental.add_documents(docs[:200])
+    incremental.add_documents(docs[200:])
+
+    query = ["knife", "market", "night"]
+    assert incremental.top_k(query, 20) == full.top_k(query, 20)
+
+
+def test_unknown_terms_and_empty_index():
+    index = BM25Index()
+    assert index.top_k(["knife"], 10) == []
+    index.add_documents(["Robbery by knife in Camp"])
+    assert index.top_k(["unknownterm"], 10) == []
+    assert index.top_k(tokenize("knife robbery"), 0) == []
+
+
+def test_indexing_leaves_the_query_token_cache_alone():
+    docs = random_docs(200, 11)
+    normalized_tokens.cache_clear()
+    index = BM25Index()
+    index.add_documents(docs)
+    assert normalized_tokens.cache_info().currsize == 0
+    assert [index.doc_len[i] for i in range(len(docs))] == [len(tokenize(d)) for d in docs]
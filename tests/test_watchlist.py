@@ -0,0 +1,96 @@
+import json
+import random
+import threading
+
+import pytest
+
+from Formatting import normalize_text
+from watchlist import (PREDICATE_FIELDS, TEXT_COLUMNS, AhoCorasick, Watchlist, add_query, load_queries,
+                       make_query, read_recent_alerts)
+
+WORDS = ["knife", "chain", "snatching", "atm", "theft", "vehicle", "hidden", "night", "gang", "online"]
+VALUES = {
+    "Police_Division": ["North", "South"],
+    "Police_Station": ["S1", "S2", "S3"],
+    "Locality": ["Camp", "Katraj", "Warje"],
+    "Criminal_Act": ["Robbery", "Smuggling"],
+    "Modus_Operandi": ["Snatching", "Hidden in vehicles"],
+}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_aho_corasick_matches_substring_search(seed):
+    rng = random.Random(seed)
+    patterns = list(dict.fromkeys("".join(rng.choices("abc", k=rng.randint(1, 5))) for _ in range(40)))
+    automaton = AhoCorasick(patterns)
+    for _ in range(50):
+        text = "".join(rng.choices("abc ", k=rng.randint(0, 30)))
+        assert automaton.search(text) == {i for i, p in enumerate(patterns) if p in text}
+
+
+def random_query(rng, i):
+    keywords = rng.sample(WORDS, rng.randint(0, 3))
+    predicates = {field: rng.sample(VALUES[col], 1) for col, field in PREDICATE_FIELDS.items() if rng.random() < 0.3}
+    if not keywords and not predicates and rng.random() < 0.7:
+        keywords = [rng.choice(WORDS)]
+    return make_query(f"q{i}", keywords, rng.choice(["any", "all"]), **predicates)
+
+
+def random_row(rng):
+    row = {col: rng.choice(values) for col, values in VALUES.items()}
+    row["FIR_Description"] = " ".join(rng.choices(WORDS + ["in", "the", "Camp"], k=rng.randint(2, 8)))
+    row["Formatted"] = f"{row['Criminal_Act']} {row['Modus_Operandi']} {row['Locality']}"
+    return row
+
+
+def brute_match(queries, row):
+    text = normalize_text(" ".join(str(row.get(c) or "") for c in TEXT_COLUMNS))
+    matches = []
+    for query in queries:
+        keywords = query["keywords"]
+        found = sorted({k for k in keywords if k in text})
+        if keywords and not found:
+            continue
+        if keywords and query["mode"] == "all" and len(found) < len(set(keywords)):
+            continue
+        if any(query[field] and row.get(col) not in query[field] for col, field in PREDICATE_FIELDS.items()):
+            continue
+        matches.append((query["id"], found))
+    return matches
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_watchlist_matches_brute_force(seed):
+    rng = random.Random(seed)
+    queries = [random_query(rng, i) for i in range(500)]
+    watchlist = Watchlist(queries)
+    for _ in range(200):
+        row = random_row(rng)
+        got = [(query["id"], keywords) for query, keywords in watchlist.match(row)]
+        assert got == brute_match(queries, row)
+
+
+def test_concurrent_adds_are_not_lost(tmp_path):
+    path = str(tmp_path / "watchlist.json")
+    threads = [threading.Thread(target=add_query, args=(path, make_query(f"q{i}", ["knife"]))) for i in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(load_queries(path)) == 30
+
+
+def test_corrupt_watchlist_raises(tmp_path):
+    path = tmp_path / "watchlist.json"
+    assert load_queries(str(path)) == []
+    path.write_text("{broken")
+    with pytest.raises(ValueError):
+        load_queries(str(path))
+
+
+@pytest.mark.parametrize("block_size", [5, 11, 37, 64, 65536])
+def test_read_recent_alerts_newest_first(tmp_path, block_size):
+    path = tmp_path / "alerts.jsonl"
+    path.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(500)))
+    alerts = read_recent_alerts(str(path), limit=10, block_size=block_size)
+    assert [a["i"] for a in alerts] == list(range(499, 489, -1))
@@ -0,0 +1,254 @@
+"""
+Standing Watch-List Queries
+---------------------------
+Saved investigator queries ("keyword list", "this MO in that locality",
+...) evaluated once against every newly registered FIR.
+
+All keywords of all saved queries are compiled into a single Aho-Corasick
+automaton, so one pass over a FIR's normalized text finds every keyword of
+every query at once. Categorical predicates (division, station, locality,
+act, modus operandi) are indexed by value: each keyword-free query is
+anchored on one of its predicates, so only queries that could possibly
+match a FIR are verified. Evaluation cost depends on the FIR's text length
+and the number of candidate queries, not on the total number of queries.
+
+Matches are appended to a JSON-lines alert log that the dashboard shows.
+"""
+
+import fcntl
+import json
+import os
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from Formatting import normalize_text
+
+# FIR column -> query field holding the allowed values
+PREDICATE_FIELDS = {
+    "Police_Division": "divisions",
+    "Police_Station": "stations",
+    "Locality": "localities",
+    "Criminal_Act": "acts",
+    "Modus_Operandi": "modus_operandi",
+}
+TEXT_COLUMNS = ("Formatted", "FIR_Description")
+
+
+def default_watchlist_path(csv_path):
+    return os.path.splitext(csv_path)[0] + "_watchlist.json"
+
+
+def default_alert_log_path(csv_path):
+    return os.path.splitext(csv_path)[0] + "_alerts.jsonl"
+
+
+def load_queries(path):
+    """Saved queries ([] if none were saved yet). A corrupt file raises instead of reading as empty,
+    which would hide every watch and let the next save overwrite them.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_queries(path, queries):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(queries, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def make_query(name, keywords=(), mode="any", **predicates):
+    """A saved query dict. `keywords` are matched as normalized substrings ("any" or "all" must occur);
+    `predicates` are PREDICATE_FIELDS values -> lists of allowed values (empty = no restriction).
+    """
+    query = {"id": uuid.uuid4().hex[:8], "name": name, "mode": mode,
+             "keywords": [k for k in (normalize_text(k) for k in keywords) if k]}
+    for field in PREDICATE_FIELDS.values():
+        query[field] = list(predicates.get(field) or [])
+    return query
+
+
+@contextmanager
+def _locked(path):
+    """Exclusive lock on `path`'s sidecar lock file, so concurrent sessions' read-modify-write cycles don't lose updates."""
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def add_query(path, query):
+    with _locked(path):
+        queries = load_queries(path)
+        queries.append(query)
+        save_queries(path, queries)
+    return query
+
+
+def remove_query(path, query_id):
+    with _locked(path):
+        save_queries(path, [q for q in load_queries(path) if q.get("id") != query_id])
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton; `search` reports the ids of all patterns occurring in a text."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for pid, pat in enumerate(patterns):
+            state = 0
+            for ch in pat:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = self.out[state] + (pid,)
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def search(self, text):
+        found = set()
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class Watchlist:
+    """Compiled form of a list of saved queries."""
+
+    def __init__(self, queries):
+        self.queries = list(queries)
+        keyword_ids = {}
+        self.keyword_queries = []  # keyword id -> [query index, ...]
+        self.checks = []  # query index -> (keywords, keyword hits needed, [(FIR column, allowed values), ...])
+        self.anchors = {col: {} for col in PREDICATE_FIELDS}  # FIR column -> value -> [query index, ...]
+        self.unanchored = []  # queries with no keyword and no predicate: match every FIR
+
+        for qi, query in enumerate(self.queries):
+            keywords = tuple(dict.fromkeys(query.get("keywords") or []))
+            predicates = [(col, frozenset(query[field])) for col, field in PREDICATE_FIELDS.items() if query.get(field)]
+            needed = len(keywords) if query.get("mode") == "all" else min(len(keywords), 1)
+            self.checks.append((keywords, needed, predicates))
+            for kw in keywords:
+                kid = keyword_ids.setdefault(kw, len(keyword_ids))
+                if kid == len(self.keyword_queries):
+                    self.keyword_queries.append([])
+                self.keyword_queries[kid].append(qi)
+            if keywords:
+                continue
+            if not predicates:
+                self.unanchored.append(qi)
+            else:
+                # anchor on the first predicate; the others are verified per candidate
+                col, values = predicates[0]
+                for value in values:
+                    self.anchors[col].setdefault(value, []).append(qi)
+
+        self.keywords = list(keyword_ids)
+        self.automaton = AhoCorasick(self.keywords)
+
+    def __len__(self):
+        return len(self.queries)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_queries(path))
+
+    def match(self, row):
+        """Evaluate one FIR (dict of column -> value) -> [(query, matched keywords), ...]."""
+        text = normalize_text(" ".join(str(row.get(c) or "") for c in TEXT_COLUMNS))
+        found = self.automaton.search(text)
+        hits = {}  # query index -> number of its keywords found
+        for kid in found:
+            for qi in self.keyword_queries[kid]:
+                hits[qi] = hits.get(qi, 0) + 1
+
+        checks = self.checks
+        candidates = {qi for qi, n in hits.items() if n >= checks[qi][1]}
+        candidates.update(self.unanchored)
+        for col, by_value in self.anchors.items():
+            candidates.update(by_value.get(row.get(col), ()))
+
+        found_words = {self.keywords[kid] for kid in found}
+        matches = []
+        for qi in sorted(candidates):
+            keywords, _, predicates = checks[qi]
+            if all(row.get(col) in allowed for col, allowed in predicates):
+                matches.append((self.queries[qi], sorted(kw for kw in keywords if kw in found_words)))
+        return matches
+
+
+def append_alerts(log_path, row, matches):
+    """Append one alert line per matched query to the JSON-lines alert log."""
+    if not matches:
+        return 0
+    now = datetime.now().isoformat(timespec="seconds")
+    with open(log_path, "a", encoding="utf-8") as f:
+        for query, keywords in matches:
+            f.write(json.dumps({
+                "time": now,
+                "fir_id": row.get("FIR_ID"),
+                "query_id": query.get("id"),
+                "query_name": query.get("name"),
+                "matched_keywords": keywords,
+                "division": row.get("Police_Division"),
+                "station": row.get("Police_Station"),
+                "locality": row.get("Locality"),
+                "act": row.get("Criminal_Act"),
+            }) + "\n")
+    return len(matches)
+
+
+def read_recent_alerts(log_path, limit=100, block_size=65536):
+    """Last `limit` alerts, newest first, reading backwards from the end of the log."""
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    if pos > 0:
+        data = data[data.index(b"\n") + 1:]  # first line may be partial
+    lines = [line for line in data.splitlines() if line.strip()]
+    alerts = []
+    for line in reversed(lines[-limit:]):
+        try:
+            alerts.append(json.loads(line))
+        except ValueError:
+            continue
+    return alerts